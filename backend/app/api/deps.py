@@ -1,17 +1,27 @@
-from collections.abc import Generator
-from typing import Annotated
+import uuid
+from collections.abc import AsyncGenerator, AsyncIterator, Generator
+from contextlib import asynccontextmanager
+from typing import Annotated, Any
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
-from sqlmodel import Session
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import ThreadpoolSession, async_engine, engine
+from app.core.principal import Principal, pet_owner_cache, principal_cache
+from app.core.replicas import replica_router
+from app.core.rag import RAGPipeline, get_rag_pipeline
 from app.models import TokenPayload
+from app.model.pet import Pet
 from app.model.user import User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -19,16 +29,43 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+def get_db(request: Request) -> Generator[Session, None, None]:
+    # The request state lets a commit keep this user's reads on the primary
+    with Session(engine, info={"request_state": request.state}) as session:
+        yield session
+
+
+@asynccontextmanager
+async def open_async_session(
+    bind: Engine, async_bind: AsyncEngine | None, info: dict[Any, Any]
+) -> AsyncIterator[AsyncSession]:
+    if async_bind is None:
+        # Not expiring on commit, like the AsyncSession below
+        sync_session = Session(bind, info=info, expire_on_commit=False)
+        try:
+            yield ThreadpoolSession(sync_session)  # type: ignore[misc]
+        finally:
+            await run_in_threadpool(sync_session.close)
+        return
+    async with AsyncSession(async_bind, expire_on_commit=False, info=info) as session:
+        yield session
+
+
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    info = {"request_state": request.state}
+    async with open_async_session(engine, async_engine, info) as session:
         yield session
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
+RAGPipelineDep = Annotated[RAGPipeline, Depends(get_rag_pipeline)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def get_current_principal(
+    request: Request, session: SessionDep, token: TokenDep
+) -> Principal:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
@@ -39,20 +76,145 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+    principal = principal_cache.get(token_data.sub) if token_data.sub else None
+    if principal is None:
+        user = session.get(User, token_data.sub)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal = Principal.from_user(user)
+        principal_cache.set(principal)
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    request.state.principal_id = principal.id
+    return principal
+
+
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+
+
+async def get_async_read_db(
+    request: Request, current_user: CurrentPrincipal
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only routes: a replica within the lag limit, or the
+    primary when there is none or the user has just written.
+    """
+    info = {"request_state": request.state}
+    replica = await replica_router.apick(current_user.id)
+    if replica is None:
+        session_cm = open_async_session(engine, async_engine, info)
+    else:
+        session_cm = open_async_session(replica.engine, replica.async_engine, info)
+    async with session_cm as session:
+        yield session
+
+
+AsyncReadSessionDep = Annotated[AsyncSession, Depends(get_async_read_db)]
+
+
+def get_current_user(session: SessionDep, principal: CurrentPrincipal) -> User:
+    # Already in the session's identity map if the principal was a cache miss
+    user = session.get(User, principal.id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    if not user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
     return user
 
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
-def get_current_active_superuser(current_user: CurrentUser) -> User:
+def get_current_active_superuser(current_user: CurrentPrincipal) -> Principal:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+def _pet_owner_memo(info: dict[Any, Any]) -> dict[uuid.UUID, uuid.UUID | None]:
+    memo: dict[uuid.UUID, uuid.UUID | None] = info.setdefault("pet_owners", {})
+    return memo
+
+
+def get_pet_owner_id(session: Session, pet_id: uuid.UUID) -> uuid.UUID | None:
+    """
+    Owner of a pet, or None if it doesn't exist. Checks the request's memo,
+    then the pet owner cache, then runs a `SELECT user_id` by primary key.
+    """
+    memo = _pet_owner_memo(session.info)
+    if pet_id not in memo:
+        owner_id = pet_owner_cache.get(pet_id)
+        if owner_id is None:
+            owner_id = session.exec(select(Pet.user_id).where(Pet.id == pet_id)).first()
+            if owner_id is not None:
+                pet_owner_cache.set(pet_id, owner_id)
+        memo[pet_id] = owner_id
+    return memo[pet_id]
+
+
+async def aget_pet_owner_id(session: AsyncSession, pet_id: uuid.UUID) -> uuid.UUID | None:
+    memo = _pet_owner_memo(session.info)
+    if pet_id not in memo:
+        owner_id = await pet_owner_cache.aget(pet_id)
+        if owner_id is None:
+            result = await session.exec(select(Pet.user_id).where(Pet.id == pet_id))
+            owner_id = result.first()
+            if owner_id is not None:
+                await pet_owner_cache.aset(pet_id, owner_id)
+        memo[pet_id] = owner_id
+    return memo[pet_id]
+
+
+def forget_pet_owner(session: Session, pet_id: uuid.UUID) -> None:
+    _pet_owner_memo(session.info).pop(pet_id, None)
+    pet_owner_cache.invalidate(pet_id)
+
+
+def _ensure_pet_owner(
+    owner_id: uuid.UUID | None, current_user: Principal, allow_superuser: bool
+) -> None:
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Pet not found")
+    if owner_id != current_user.id and not (allow_superuser and current_user.is_superuser):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+
+
+def check_pet_owner(
+    session: Session,
+    current_user: Principal,
+    pet_id: uuid.UUID,
+    *,
+    allow_superuser: bool = False,
+) -> None:
+    owner_id = get_pet_owner_id(session, pet_id)
+    _ensure_pet_owner(owner_id, current_user, allow_superuser)
+
+
+async def acheck_pet_owner(
+    session: AsyncSession,
+    current_user: Principal,
+    pet_id: uuid.UUID,
+    *,
+    allow_superuser: bool = False,
+) -> None:
+    owner_id = await aget_pet_owner_id(session, pet_id)
+    _ensure_pet_owner(owner_id, current_user, allow_superuser)
+
+
+def get_owned_pet_id(
+    session: SessionDep, current_user: CurrentPrincipal, id: uuid.UUID
+) -> uuid.UUID:
+    check_pet_owner(session, current_user, id)
+    return id
+
+
+async def aget_owned_pet_id(
+    session: AsyncReadSessionDep, current_user: CurrentPrincipal, id: uuid.UUID
+) -> uuid.UUID:
+    await acheck_pet_owner(session, current_user, id)
+    return id
+
+
+# Path `id` of a pet the current user owns, checked without loading the pet
+OwnedPetId = Annotated[uuid.UUID, Depends(get_owned_pet_id)]
+AsyncOwnedPetId = Annotated[uuid.UUID, Depends(aget_owned_pet_id)]
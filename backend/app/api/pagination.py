@@ -0,0 +1,109 @@
+import base64
+import binascii
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy import literal, tuple_
+from sqlmodel import Session, SQLModel, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+ModelT = TypeVar("ModelT", bound=SQLModel)
+
+
+def encode_cursor(created_at: datetime, id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _count_statement(statement: SelectOfScalar[Any]) -> SelectOfScalar[int]:
+    return select(func.count()).select_from(statement.subquery())
+
+
+def count_rows(session: Session, statement: SelectOfScalar[Any]) -> int:
+    return session.exec(_count_statement(statement)).one()
+
+
+async def acount_rows(session: AsyncSession, statement: SelectOfScalar[Any]) -> int:
+    return (await session.exec(_count_statement(statement))).one()
+
+
+def _page_statement(
+    statement: SelectOfScalar[ModelT],
+    model: type[ModelT],
+    *,
+    skip: int,
+    limit: int,
+    cursor: str | None,
+) -> SelectOfScalar[ModelT]:
+    created_at = model.created_at  # type: ignore[attr-defined]
+    id = model.id  # type: ignore[attr-defined]
+    if cursor:
+        after_created_at, after_id = decode_cursor(cursor)
+        after = tuple_(
+            literal(after_created_at, created_at.type), literal(after_id, id.type)
+        )
+        statement = statement.where(tuple_(created_at, id) > after)
+    else:
+        statement = statement.offset(skip)
+    return statement.order_by(created_at, id).limit(limit + 1)
+
+
+def _split_page(
+    rows: Sequence[ModelT], limit: int
+) -> tuple[Sequence[ModelT], str | None]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)  # type: ignore[attr-defined]
+    return rows, next_cursor
+
+
+def paginate(
+    session: Session,
+    statement: SelectOfScalar[ModelT],
+    model: type[ModelT],
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> tuple[Sequence[ModelT], str | None]:
+    """
+    Page through `statement` ordered by (created_at, id).
+
+    With a cursor the page starts right after the encoded row, which the
+    (..., created_at) indexes resolve as a range scan however deep the page
+    is. Without one it falls back to offset paging so old clients keep
+    working. Returns the rows and the cursor for the following page.
+    """
+    statement = _page_statement(statement, model, skip=skip, limit=limit, cursor=cursor)
+    return _split_page(session.exec(statement).all(), limit)
+
+
+async def apaginate(
+    session: AsyncSession,
+    statement: SelectOfScalar[ModelT],
+    model: type[ModelT],
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> tuple[Sequence[ModelT], str | None]:
+    """
+    `paginate` for an AsyncSession.
+    """
+    statement = _page_statement(statement, model, skip=skip, limit=limit, cursor=cursor)
+    return _split_page((await session.exec(statement)).all(), limit)
@@ -1,20 +1,30 @@
 
+import json
+import logging
 import os
 import ast
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
 
 from dotenv import load_dotenv
-from fastapi import APIRouter
-from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from typing import Annotated, Any, Optional
 
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_pinecone import PineconeVectorStore
-from pinecone import Pinecone
 
+from app.api.deps import RAGPipelineDep
 from app.models import ChatRequest, ChatResponse
+from app.core.chat_cache import chat_response_cache
+from app.core.llm import llm_limiter
 from app.core.prompt import Prompt
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/chat", tags=["chats"])
 
 load_dotenv()
@@ -22,10 +32,11 @@ load_dotenv()
 # Read from dotenv
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL_NAME = os.getenv("OPENAI_MODEL_NAME", "gpt-4o")
-PINECONE_KEY = os.getenv("PINECONE_KEY", "")
-PINECONE_ENV = os.getenv("PINECONE_ENV", "")
-PINECONE_INDEX = os.getenv("PINECONE_INDEX", "")
-PINECONE_NAMESPACE = os.getenv("PINECONE_NAMESPACE", "")
+
+rag_prompt = ChatPromptTemplate.from_messages([
+    ("system", Prompt.Rag_Assistant_System_Prompt),
+    ("user", "{query}"),
+])
 
 openai_llm = ChatOpenAI(
     model=OPENAI_MODEL_NAME,
@@ -36,7 +47,7 @@ openai_llm = ChatOpenAI(
     api_key=OPENAI_API_KEY,
 )
 
-def generate_openai_response(system_prompt: str, user_message: str) -> str:
+async def generate_openai_response(system_prompt: str, user_message: str) -> str:
 
     messages = [
         (
@@ -49,18 +60,160 @@ def generate_openai_response(system_prompt: str, user_message: str) -> str:
         ),
     ]
 
-    return openai_llm.invoke(messages).content
+    async with llm_limiter.slot():
+        response = await openai_llm.ainvoke(messages)
+    return response.content
+
+
+def _cache_directives(cache_control: str | None) -> set[str]:
+    return {d.strip().lower() for d in (cache_control or "").split(",")}
+
+
+@dataclass
+class StreamStats:
+    streams: int = 0
+    disconnects: int = 0
+    ttft_samples: int = 0
+    ttft_seconds_total: float = 0.0
+    ttft_seconds_max: float = 0.0
+
+    def record_first_token(self, seconds: float) -> None:
+        self.ttft_samples += 1
+        self.ttft_seconds_total += seconds
+        self.ttft_seconds_max = max(self.ttft_seconds_max, seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "streams": self.streams,
+            "disconnects": self.disconnects,
+            "ttft_seconds_avg": round(self.ttft_seconds_total / self.ttft_samples, 3)
+            if self.ttft_samples
+            else 0.0,
+            "ttft_seconds_max": round(self.ttft_seconds_max, 3),
+        }
+
+
+stream_stats = StreamStats()
+
+
+async def _sse_events(
+    http_request: Request,
+    chunks: AsyncIterator[str],
+    release: Callable[[], None] | None = None,
+    on_complete: Callable[[str], Awaitable[None]] | None = None,
+) -> AsyncIterator[str]:
+    """
+    Relay model chunks as Server-Sent Events.
+
+    Chunks are pulled from the model only as fast as the client reads them,
+    and generation is abandoned as soon as the client goes away. `release`
+    frees the LLM concurrency slot once the model is done. Without one the
+    chunks are a cached answer, which is kept out of the TTFT stats.
+    """
+    started = time.perf_counter()
+    parts: list[str] = []
+    stream_stats.streams += 1
+    try:
+        async for chunk in chunks:
+            if not parts and release is not None:
+                ttft = time.perf_counter() - started
+                stream_stats.record_first_token(ttft)
+                logger.info(f"Chat stream time to first token: {ttft:.3f}s")
+            if await http_request.is_disconnected():
+                stream_stats.disconnects += 1
+                return
+            parts.append(chunk)
+            yield f"data: {json.dumps({'delta': chunk})}\n\n"
+        if on_complete is not None:
+            await on_complete("".join(parts))
+        yield "event: done\ndata: {}\n\n"
+    except Exception as e:
+        logger.error(f"Chat stream failed: {e}")
+        yield f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n"
+    finally:
+        # Before any await, which a cancellation could interrupt
+        if release is not None:
+            release()
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+class _SlotStreamingResponse(StreamingResponse):
+    """
+    A streaming response that frees its LLM slot however it ends, including
+    when the client leaves before the body starts and the stream generator
+    never runs.
+    """
+
+    def __init__(
+        self, content: AsyncIterator[str], release: Callable[[], None], **kwargs: Any
+    ) -> None:
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+
+
+async def _event_stream(
+    http_request: Request,
+    chunks_factory: Callable[[], AsyncIterator[str]],
+    on_complete: Callable[[str], Awaitable[None]] | None = None,
+) -> StreamingResponse:
+    # Take the concurrency slot before the response starts so a saturated
+    # worker can still answer 429 instead of an empty stream.
+    release = await llm_limiter.acquire()
+    try:
+        chunks = chunks_factory()
+    except BaseException:
+        release()
+        raise
+    return _SlotStreamingResponse(
+        _sse_events(http_request, chunks, release, on_complete),
+        release,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _single_chunk(text: str) -> AsyncIterator[str]:
+    yield text
 
 
 @router.post("/get_text_response", response_model=ChatResponse)
-async def chat_with_openai(request: ChatRequest) -> ChatResponse:
+async def chat_with_openai(
+    request: ChatRequest,
+    response: Response,
+    cache_control: Annotated[str | None, Header()] = None,
+) -> ChatResponse:
     """
     Endpoint to generate a response using OpenAI gpt-4o model
+
+    Answers are cached per prompt, model and message. Send
+    `Cache-Control: no-cache` to force a fresh answer, or `no-store` to also
+    keep it out of the cache.
     """
     system_prompt = Prompt.Chat_Assistant_System_Prompt
     user_input = request.message
+    directives = _cache_directives(cache_control)
+    use_cache = not directives & {"no-cache", "no-store"}
 
-    ai_response = generate_openai_response(system_prompt, user_input)
+    ai_response = None
+    if use_cache:
+        ai_response = await chat_response_cache.aget(
+            system_prompt, OPENAI_MODEL_NAME, user_input
+        )
+    response.headers["X-Cache"] = "HIT" if ai_response is not None else "MISS"
+    if ai_response is None:
+        ai_response = await generate_openai_response(system_prompt, user_input)
+        if "no-store" not in directives:
+            await chat_response_cache.aset(
+                system_prompt, OPENAI_MODEL_NAME, user_input, ai_response
+            )
     print("AI result: ", ai_response)
     message = ai_response
 
@@ -69,6 +222,7 @@ async def chat_with_openai(request: ChatRequest) -> ChatResponse:
 @router.post("/get_text_response_rag", response_model=ChatResponse)
 async def chat_with_rag(
     request: ChatRequest,
+    rag: RAGPipelineDep,
     context_prefix: Optional[str] = "",
     max_tokens: Optional[int] = 1000,
     temperature: Optional[float] = 0.7
@@ -77,64 +231,100 @@ async def chat_with_rag(
     Endpoint to generate a response using RAG (Retrieval Augmented Generation)
     """
     try:
-        # Initialize OpenAI
-        chat = ChatOpenAI(
-            model=OPENAI_MODEL_NAME,
-            temperature=0.9,
-            max_tokens=1000,
-            api_key=OPENAI_API_KEY,
-        )
+        chain = rag_prompt | rag.chat | StrOutputParser()
 
-        # Initialize Pinecone and vector store
-        pc = Pinecone(api_key=PINECONE_KEY)
-        embeddings = OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
-        vectorstore = PineconeVectorStore(
-            pinecone_api_key=PINECONE_KEY,
-            index_name=PINECONE_INDEX,
-            embedding=embeddings,
-            namespace=PINECONE_NAMESPACE
-        )
-        retriever = vectorstore.as_retriever(
-            search_kwargs={"k": 4}  # Retrieve top 3 most relevant documents
+        async with llm_limiter.slot():
+            # Get relevant documents
+            retrieved_docs = await rag.retrieve(request.message)
+            retrieved_context = "\n\n".join([doc.page_content for doc in retrieved_docs])
+
+            # Generate response
+            response = await chain.ainvoke({
+                "query": request.message,
+                "context_prefix": context_prefix,
+                "retrieved_context": retrieved_context
+            })
+
+        return ChatResponse(message=response)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        return ChatResponse(message=f"Error: {str(e)}")
+
+
+@router.post("/get_text_response/stream")
+async def chat_with_openai_stream(
+    request: ChatRequest,
+    http_request: Request,
+    cache_control: Annotated[str | None, Header()] = None,
+) -> StreamingResponse:
+    """
+    Stream the assistant's answer token by token as Server-Sent Events.
+
+    Each event carries `{"delta": "..."}`; the stream ends with a `done`
+    event. Caching follows /get_text_response.
+    """
+    system_prompt = Prompt.Chat_Assistant_System_Prompt
+    user_input = request.message
+    directives = _cache_directives(cache_control)
+
+    if not directives & {"no-cache", "no-store"}:
+        cached = await chat_response_cache.aget(
+            system_prompt, OPENAI_MODEL_NAME, user_input
         )
+        if cached is not None:
+            return StreamingResponse(
+                _sse_events(http_request, _single_chunk(cached)),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Cache": "HIT"},
+            )
 
-        # Get relevant documents
-        retrieved_docs = retriever.invoke(request.message)
-        retrieved_context = "\n\n".join([doc.page_content for doc in retrieved_docs])
+    async def store(answer: str) -> None:
+        if "no-store" not in directives:
+            await chat_response_cache.aset(
+                system_prompt, OPENAI_MODEL_NAME, user_input, answer
+            )
+
+    def chunks() -> AsyncIterator[str]:
+        chain = openai_llm | StrOutputParser()
+        return chain.astream([("system", system_prompt), ("user", user_input)])
+
+    return await _event_stream(http_request, chunks, on_complete=store)
+
+
+@router.post("/get_text_response_rag/stream")
+async def chat_with_rag_stream(
+    request: ChatRequest,
+    http_request: Request,
+    rag: RAGPipelineDep,
+    context_prefix: Optional[str] = "",
+) -> StreamingResponse:
+    """
+    Stream a RAG answer token by token as Server-Sent Events.
+    """
 
-        # Create RAG prompt
-        rag_prompt = ChatPromptTemplate.from_messages([
-            (
-                "system",
-                """
-                    You are a Gig Platform assistant that provides accurate information based on the given context.
-                    {context_prefix}
-
-                    Make the response for drivers and provide some advice and guide using these answers.
-
-                    Use the following retrieved information to answer the question:
-                    {retrieved_context}
-
-                    Create precise and structured questions about the user’s questions and requests. Your answers should be consistent, conversational, and clearly emphasize the answer you are providing to the user.
-                    Response should be short less than 1~2 sentences. only return detail response if user require.
-                    All of response should related about gig-worker.
-                """
-            ),
-            (
-                "user", "{query}")
-        ])
-
-        # Generate response
-        chain = rag_prompt | chat | StrOutputParser()
-        
-        response = chain.invoke({
+    async def chunks() -> AsyncIterator[str]:
+        retrieved_docs = await rag.retrieve(request.message)
+        retrieved_context = "\n\n".join([doc.page_content for doc in retrieved_docs])
+        chain = rag_prompt | rag.chat | StrOutputParser()
+        async for chunk in chain.astream({
             "query": request.message,
             "context_prefix": context_prefix,
             "retrieved_context": retrieved_context
-        })
+        }):
+            yield chunk
 
-        return ChatResponse(message=response)
+    return await _event_stream(http_request, chunks)
 
-    except Exception as e:
-        return ChatResponse(message=f"Error: {str(e)}")
 
+@router.get("/rag/health")
+async def rag_health(rag: RAGPipelineDep) -> dict[str, Any]:
+    """
+    Report whether the shared RAG pipeline is built, plus its counters.
+    """
+    return {
+        **rag.health(),
+        "response_cache": chat_response_cache.stats(),
+        "streams": stream_stats.as_dict(),
+    }
@@ -1,13 +1,28 @@
+import asyncio
 import uuid
-from typing import Any
+from datetime import date
+from typing import Annotated, Any, cast
 
-from fastapi import APIRouter, HTTPException, File, UploadFile
-from sqlmodel import func, select
+from fastapi import APIRouter, Body, HTTPException, File, UploadFile
+from sqlalchemy import or_
+from sqlalchemy.orm import QueryableAttribute, selectinload
+from sqlmodel import col, select
 from pydantic import BaseModel, Field
-import os
-from pathlib import Path
 
-from app.api.deps import CurrentUser, SessionDep
+from app import crud
+from app.api.deps import (
+    AsyncOwnedPetId,
+    AsyncReadSessionDep,
+    AsyncSessionDep,
+    CurrentPrincipal,
+    OwnedPetId,
+    SessionDep,
+    check_pet_owner,
+    forget_pet_owner,
+)
+from app.api.pagination import acount_rows, apaginate
+from app.core.avatars import prune_avatar_versions, save_avatar
+from app.core.config import settings
 from app.model.pet import Pet, PetCreate, PetPublic, PetsPublic, PetUpdate
 from app.models import Message
 from app.model.insurance import Insurance, InsuranceUpdate, InsurancePublic
@@ -15,47 +30,56 @@ from app.model.vaccination import Vaccination, VaccinationCreate, VaccinationPub
 from app.model.allergi import Allergi, AllergiCreate, AllergiPublic
 from app.model.medical_condition import MedicalCondition, MedicalConditionUpdate, MedicalConditionPublic
 from app.model.medication import Medication, MedicationUpdate, MedicationPublic
+from app.model.food_scan_result import FoodScanResult
+from app.model.reminder import Reminder
+from app.model.pet_full import PetFullPublic
 
 router = APIRouter(prefix="/pets", tags=["pets"])
 
 
+def _relationship(attribute: Any) -> QueryableAttribute[Any]:
+    # SQLModel types relationships as their value (list[...]); on the class
+    # they are the attributes loader options take
+    return cast(QueryableAttribute[Any], attribute)
+
+
 @router.get("/", response_model=PetsPublic)
-def read_pets(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+async def read_pets(
+    session: AsyncReadSessionDep,
+    current_user: CurrentPrincipal,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool | None = None,
 ) -> Any:
     """
     Retrieve pets.
+
+    Pass the returned `next_cursor` back as `cursor` to page by keyset
+    instead of offset; the total count is then only computed when
+    `include_count=true`.
     """
 
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Pet)
-        count = session.exec(count_statement).one()
-        statement = select(Pet).offset(skip).limit(limit)
-        pets = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Pet)
-            .where(Pet.user_id == current_user.id)
-        )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Pet)
-            .where(Pet.user_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
-        )
-        pets = session.exec(statement).all()
+    statement = select(Pet)
+    if not current_user.is_superuser:
+        statement = statement.where(Pet.user_id == current_user.id)
 
-    return PetsPublic(data=pets, count=count)
+    if include_count is None:
+        include_count = cursor is None
+    count = await acount_rows(session, statement) if include_count else None
+    pets, next_cursor = await apaginate(
+        session, statement, Pet, skip=skip, limit=limit, cursor=cursor
+    )
+
+    return PetsPublic(data=pets, count=count, next_cursor=next_cursor)
 
 
 @router.get("/{id}", response_model=PetPublic)
-def read_pet(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+async def read_pet(session: AsyncReadSessionDep, current_user: CurrentPrincipal, id: uuid.UUID) -> Any:
     """
     Get pet by ID.
     """
-    pet = session.get(Pet, id)
+    pet = await session.get(Pet, id)
     if not pet:
         raise HTTPException(status_code=404, detail="Pet not found")
     if not current_user.is_superuser and (pet.user_id != current_user.id):
@@ -63,25 +87,90 @@ def read_pet(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> A
     return pet
 
 
+@router.get("/{id}/full", response_model=PetFullPublic)
+async def read_pet_full(
+    session: AsyncReadSessionDep,
+    current_user: CurrentPrincipal,
+    id: uuid.UUID,
+    scan_limit: int = 5,
+    reminder_limit: int = 10,
+) -> Any:
+    """
+    Get pet by ID with its health records, latest food scans and upcoming reminders.
+    """
+    pet = (await session.exec(
+        select(Pet)
+        .where(Pet.id == id)
+        .options(
+            selectinload(_relationship(Pet.insurance)),
+            selectinload(_relationship(Pet.medical_conditions)),
+            selectinload(_relationship(Pet.medications)),
+            selectinload(_relationship(Pet.allergies)),
+            selectinload(_relationship(Pet.vaccinations)),
+        )
+    )).first()
+    if not pet:
+        raise HTTPException(status_code=404, detail="Pet not found")
+    if not current_user.is_superuser and (pet.user_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+
+    food_scan_results = (await session.exec(
+        select(FoodScanResult)
+        .where(FoodScanResult.pet_id == id)
+        .order_by(col(FoodScanResult.created_at).desc())
+        .limit(scan_limit)
+    )).all()
+    today = date.today()
+    upcoming_reminders = (await session.exec(
+        select(Reminder)
+        .where(
+            Reminder.pet_id == id,
+            col(Reminder.is_active).is_(True),
+            or_(
+                col(Reminder.reminder_date).is_(None),
+                col(Reminder.reminder_date) >= today,
+                col(Reminder.frequency) != "Never",
+            ),
+            or_(
+                col(Reminder.end_frequency_date).is_(None),
+                col(Reminder.end_frequency_date) >= today,
+            ),
+        )
+        .order_by(
+            col(Reminder.reminder_date).asc().nulls_last(),
+            col(Reminder.reminder_time).asc(),
+        )
+        .limit(reminder_limit)
+    )).all()
+
+    return PetFullPublic.model_validate(
+        pet,
+        update={
+            "insurance": next(iter(pet.insurance), None),
+            "medical_condition": next(iter(pet.medical_conditions), None),
+            "medication": next(iter(pet.medications), None),
+            "food_scan_results": food_scan_results,
+            "upcoming_reminders": upcoming_reminders,
+        },
+    )
+
+
 @router.post("/", response_model=PetPublic)
 def create_pet(
-    *, session: SessionDep, current_user: CurrentUser, pet_in: PetCreate
+    *, session: SessionDep, current_user: CurrentPrincipal, pet_in: PetCreate
 ) -> Any:
     """
     Create new pet.
     """
     pet = Pet.model_validate(pet_in, update={"user_id": current_user.id})
-    session.add(pet)
-    session.commit()
-    session.refresh(pet)
-    return pet
+    return crud.save(session=session, db_obj=pet)
 
 
 @router.post("/{id}", response_model=PetPublic)
 def update_pet(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     id: uuid.UUID,
     pet_in: PetUpdate,
 ) -> Any:
@@ -95,15 +184,12 @@ def update_pet(
         raise HTTPException(status_code=400, detail="Not enough permissions")
     update_dict = pet_in.model_dump(exclude_unset=True)
     pet.sqlmodel_update(update_dict)
-    session.add(pet)
-    session.commit()
-    session.refresh(pet)
-    return pet
+    return crud.save(session=session, db_obj=pet)
 
 
 @router.delete("/{id}")
 def delete_pet(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+    session: SessionDep, current_user: CurrentPrincipal, id: uuid.UUID
 ) -> Message:
     """
     Delete a pet.
@@ -115,6 +201,7 @@ def delete_pet(
         raise HTTPException(status_code=400, detail="Not enough permissions")
     session.delete(pet)
     session.commit()
+    forget_pet_owner(session, id)
     return Message(message="Pet deleted successfully")
 
 
@@ -137,10 +224,7 @@ def update_pet_bio(
         raise HTTPException(status_code=404, detail="Pet not found")
     
     pet.bio = bio_update.bio
-    session.add(pet)
-    session.commit()
-    session.refresh(pet)
-    return pet
+    return crud.save(session=session, db_obj=pet)
 
 
 class PetProfileUpdate(BaseModel):
@@ -171,10 +255,7 @@ def update_pet_profile(
     
     update_dict = profile_update.model_dump(exclude_unset=True)
     pet.sqlmodel_update(update_dict)
-    session.add(pet)
-    session.commit()
-    session.refresh(pet)
-    return pet
+    return crud.save(session=session, db_obj=pet)
 
 
 class PetFavoritesUpdate(BaseModel):
@@ -187,7 +268,7 @@ class PetFavoritesUpdate(BaseModel):
 def update_pet_favorites(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     id: uuid.UUID,
     favorites_update: PetFavoritesUpdate,
 ) -> Any:
@@ -202,10 +283,7 @@ def update_pet_favorites(
     
     update_dict = favorites_update.model_dump(exclude_unset=True)
     pet.sqlmodel_update(update_dict)
-    session.add(pet)
-    session.commit()
-    session.refresh(pet)
-    return pet
+    return crud.save(session=session, db_obj=pet)
 
 
 class PetBehaviorUpdate(BaseModel):
@@ -218,7 +296,7 @@ class PetBehaviorUpdate(BaseModel):
 def update_pet_behavior(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     id: uuid.UUID,
     behavior_update: PetBehaviorUpdate,
 ) -> Any:
@@ -233,10 +311,7 @@ def update_pet_behavior(
     
     update_dict = behavior_update.model_dump(exclude_unset=True)
     pet.sqlmodel_update(update_dict)
-    session.add(pet)
-    session.commit()
-    session.refresh(pet)
-    return pet
+    return crud.save(session=session, db_obj=pet)
 
 
 class PetRoutineUpdate(BaseModel):
@@ -249,7 +324,7 @@ class PetRoutineUpdate(BaseModel):
 def update_pet_routine(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     id: uuid.UUID,
     routine_update: PetRoutineUpdate,
 ) -> Any:
@@ -264,10 +339,7 @@ def update_pet_routine(
     
     update_dict = routine_update.model_dump(exclude_unset=True)
     pet.sqlmodel_update(update_dict)
-    session.add(pet)
-    session.commit()
-    session.refresh(pet)
-    return pet
+    return crud.save(session=session, db_obj=pet)
 
 
 class PetInsuranceUpdate(BaseModel):
@@ -285,39 +357,19 @@ class PetInsuranceUpdate(BaseModel):
 def update_pet_insurance(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
-    id: uuid.UUID,
+    id: OwnedPetId,
     insurance_update: PetInsuranceUpdate,
 ) -> Any:
     
     """
     Update a pet's insurance information.
     """
-    pet = session.get(Pet, id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    if pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    
-    # Get or create insurance record for this pet
-    insurance = session.exec(
-        select(Insurance).where(Insurance.pet_id == id)
-    ).first()
-    
-    if not insurance:
-        # Create new insurance record
-        insurance_data = insurance_update.model_dump(exclude_unset=True)
-        insurance = Insurance(**insurance_data, pet_id=id)
-        session.add(insurance)
-    else:
-        # Update existing insurance record
-        update_dict = insurance_update.model_dump(exclude_unset=True)
-        insurance.sqlmodel_update(update_dict)
-        session.add(insurance)
-    
-    session.commit()
-    session.refresh(insurance)
-    return insurance
+    update_dict = insurance_update.model_dump(exclude_unset=True)
+    insurance = Insurance(**update_dict, pet_id=id)
+    # One statement, so two devices saving at once can't both insert
+    return crud.upsert(
+        session=session, db_obj=insurance, conflict_on=["pet_id"], update=update_dict
+    )
 
 
 # Vaccination APIs
@@ -325,41 +377,46 @@ def update_pet_insurance(
 def add_pet_vaccination(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
-    id: uuid.UUID,
+    id: OwnedPetId,
     vaccination_in: VaccinationCreate,
 ) -> Any:
     """
     Add a vaccination record to a pet.
     """
-    pet = session.get(Pet, id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    if pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    
     vaccination = Vaccination.model_validate(vaccination_in, update={"pet_id": id})
-    session.add(vaccination)
-    session.commit()
-    session.refresh(vaccination)
-    return vaccination
+    return crud.save(session=session, db_obj=vaccination)
+
+
+@router.post("/{id}/vaccinations:batch", response_model=list[VaccinationPublic])
+def add_pet_vaccinations_batch(
+    *,
+    session: SessionDep,
+    id: OwnedPetId,
+    vaccinations_in: Annotated[
+        list[VaccinationCreate], Body(min_length=1, max_length=settings.BATCH_MAX_SIZE)
+    ],
+) -> Any:
+    """
+    Add several vaccination records to a pet at once.
+    """
+    vaccinations = [
+        Vaccination.model_validate(vaccination_in, update={"pet_id": id})
+        for vaccination_in in vaccinations_in
+    ]
+    return crud.create_many(session=session, db_objs=vaccinations)
 
 
 @router.delete("/{id}/vaccinations/{vaccination_id}")
 def remove_pet_vaccination(
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     id: uuid.UUID,
     vaccination_id: uuid.UUID,
 ) -> Message:
     """
     Remove a vaccination record from a pet.
     """
-    pet = session.get(Pet, id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    if not current_user.is_superuser and (pet.user_id != current_user.id):
-        raise HTTPException(status_code=400, detail="Not enough permissions")
+    check_pet_owner(session, current_user, id, allow_superuser=True)
     
     vaccination = session.get(Vaccination, vaccination_id)
     if not vaccination or vaccination.pet_id != id:
@@ -375,42 +432,44 @@ def remove_pet_vaccination(
 def add_pet_allergy(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
-    id: uuid.UUID,
+    id: OwnedPetId,
     allergy_in: AllergiCreate,
 ) -> Any:
     """
     Add an allergy record to a pet.
     """
-    pet = session.get(Pet, id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    if pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    
     allergy = Allergi.model_validate(allergy_in, update={"pet_id": id})
-    session.add(allergy)
-    session.commit()
-    session.refresh(allergy)
-    return allergy
+    return crud.save(session=session, db_obj=allergy)
+
+
+@router.post("/{id}/allergies:batch", response_model=list[AllergiPublic])
+def add_pet_allergies_batch(
+    *,
+    session: SessionDep,
+    id: OwnedPetId,
+    allergies_in: Annotated[
+        list[AllergiCreate], Body(min_length=1, max_length=settings.BATCH_MAX_SIZE)
+    ],
+) -> Any:
+    """
+    Add several allergy records to a pet at once.
+    """
+    allergies = [
+        Allergi.model_validate(allergy_in, update={"pet_id": id})
+        for allergy_in in allergies_in
+    ]
+    return crud.create_many(session=session, db_objs=allergies)
 
 
 @router.delete("/{id}/allergies/{allergy_id}")
 def remove_pet_allergy(
     session: SessionDep,
-    current_user: CurrentUser,
-    id: uuid.UUID,
+    id: OwnedPetId,
     allergy_id: uuid.UUID,
 ) -> Message:
     """
     Remove an allergy record from a pet.
     """
-    pet = session.get(Pet, id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    if pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    
     allergy = session.get(Allergi, allergy_id)
     if not allergy or allergy.pet_id != id:
         raise HTTPException(status_code=404, detail="Allergy not found")
@@ -425,38 +484,17 @@ def remove_pet_allergy(
 def update_pet_medical_condition(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
-    id: uuid.UUID,
+    id: OwnedPetId,
     condition_update: MedicalConditionUpdate,
 ) -> Any:
     """
     Update or create a pet's medical condition.
     """
-    pet = session.get(Pet, id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    if pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    
-    # Get existing medical condition for this pet
-    condition = session.exec(
-        select(MedicalCondition).where(MedicalCondition.pet_id == id)
-    ).first()
-    
-    if not condition:
-        # Create new medical condition record
-        condition_data = condition_update.model_dump(exclude_unset=True)
-        condition = MedicalCondition(**condition_data, pet_id=id)
-        session.add(condition)
-    else:
-        # Update existing medical condition record
-        update_dict = condition_update.model_dump(exclude_unset=True)
-        condition.sqlmodel_update(update_dict)
-        session.add(condition)
-    
-    session.commit()
-    session.refresh(condition)
-    return condition
+    update_dict = condition_update.model_dump(exclude_unset=True)
+    condition = MedicalCondition(**update_dict, pet_id=id)
+    return crud.upsert(
+        session=session, db_obj=condition, conflict_on=["pet_id"], update=update_dict
+    )
 
 
 # Medication APIs
@@ -464,145 +502,94 @@ def update_pet_medical_condition(
 def update_pet_medication(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
-    id: uuid.UUID,
+    id: OwnedPetId,
     medication_update: MedicationUpdate,
 ) -> Any:
     """
     Update or create a pet's medication.
     """
-    pet = session.get(Pet, id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    if pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    
-    # Get existing medication for this pet
-    medication = session.exec(
-        select(Medication).where(Medication.pet_id == id)
-    ).first()
-    
-    if not medication:
-        # Create new medication record
-        medication_data = medication_update.model_dump(exclude_unset=True)
-        medication = Medication(**medication_data, pet_id=id)
-        session.add(medication)
-    else:
-        # Update existing medication record
-        update_dict = medication_update.model_dump(exclude_unset=True)
-        medication.sqlmodel_update(update_dict)
-        session.add(medication)
-    
-    session.commit()
-    session.refresh(medication)
-    return medication
+    update_dict = medication_update.model_dump(exclude_unset=True)
+    medication = Medication(**update_dict, pet_id=id)
+    return crud.upsert(
+        session=session, db_obj=medication, conflict_on=["pet_id"], update=update_dict
+    )
 
 
 # GET APIs for pet health information
 @router.get("/{id}/medical-condition", response_model=MedicalConditionPublic | None)
-def get_pet_medical_condition(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def get_pet_medical_condition(
+    session: AsyncReadSessionDep, id: AsyncOwnedPetId
 ) -> Any:
     """
     Get pet's medical condition.
     """
-    pet = session.get(Pet, id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    if pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    
-    condition = session.exec(
+    condition = (await session.exec(
         select(MedicalCondition).where(MedicalCondition.pet_id == id)
-    ).first()
+    )).first()
     
     return condition
 
 
 @router.get("/{id}/medication", response_model=MedicationPublic | None)
-def get_pet_medication(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def get_pet_medication(
+    session: AsyncReadSessionDep, id: AsyncOwnedPetId
 ) -> Any:
     """
     Get pet's medication.
     """
-    pet = session.get(Pet, id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    if pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    
-    medication = session.exec(
+    medication = (await session.exec(
         select(Medication).where(Medication.pet_id == id)
-    ).first()
+    )).first()
     
     return medication
 
 
 @router.get("/{id}/insurance", response_model=InsurancePublic | None)
-def get_pet_insurance(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def get_pet_insurance(
+    session: AsyncReadSessionDep, id: AsyncOwnedPetId
 ) -> Any:
     """
     Get pet's insurance.
     """
-    pet = session.get(Pet, id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    if pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    
-    insurance = session.exec(
+    insurance = (await session.exec(
         select(Insurance).where(Insurance.pet_id == id)
-    ).first()
+    )).first()
     
     return insurance
 
 
 @router.get("/{id}/allergies", response_model=list[AllergiPublic])
-def get_pet_allergies(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def get_pet_allergies(
+    session: AsyncReadSessionDep, id: AsyncOwnedPetId
 ) -> Any:
     """
     Get pet's allergies.
     """
-    pet = session.get(Pet, id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    if pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    
-    allergies = session.exec(
+    allergies = (await session.exec(
         select(Allergi).where(Allergi.pet_id == id)
-    ).all()
+    )).all()
     
     return allergies
 
 
 @router.get("/{id}/vaccinations", response_model=list[VaccinationPublic])
-def get_pet_vaccinations(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def get_pet_vaccinations(
+    session: AsyncReadSessionDep, id: AsyncOwnedPetId
 ) -> Any:
     """
     Get pet's vaccinations.
     """
-    pet = session.get(Pet, id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    if pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    
-    vaccinations = session.exec(
+    vaccinations = (await session.exec(
         select(Vaccination).where(Vaccination.pet_id == id)
-    ).all()
+    )).all()
     
     return vaccinations
 
 
 @router.post("/{id}/avatar", response_model=PetPublic)
 async def upload_pet_avatar(
-    session: SessionDep,
-    id: uuid.UUID,
+    session: AsyncSessionDep,
+    id: AsyncOwnedPetId,
     file: UploadFile = File(...)
 ):
     """
@@ -610,43 +597,34 @@ async def upload_pet_avatar(
     """
     try:
         # Verify pet exists
-        pet = session.get(Pet, id)
+        pet = await session.get(Pet, id)
         if not pet:
             raise HTTPException(status_code=404, detail="Pet not found")
         
-        # Validate file type
-        if not file.content_type or not file.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="File must be an image")
-        
-        # Create directory if it doesn't exist
-        avatar_dir = Path("upload/images/avatar")
-        avatar_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Read image data
-        image_data = await file.read()
-
-        public_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "public")
-        os.makedirs(public_dir, exist_ok=True)
-        image_path = os.path.join(public_dir, "test_avatar.png")
-        with open(image_path, "wb") as f:
-            f.write(image_data)
-        
-        # Save image with pet_id as filename
-        file_path = avatar_dir / f"{pet.id}.png"
-        with open(file_path, "wb") as f:
-            f.write(image_data)
-        
-        # Create URI for database
-        avatar_uri = f"/images/avatar/{pet.id}.png"
+        # Streamed to disk and re-encoded as sized renditions off the event loop
+        avatar_uri = await save_avatar(file, pet.id)
         
         # Update pet avatar field
+        replaced = pet.avatar
         pet.avatar = avatar_uri
         session.add(pet)
-        session.commit()
-        session.refresh(pet)
+        await session.commit()
+
+        # Replaced versions stay servable for a grace period, then go
+        await asyncio.to_thread(
+            prune_avatar_versions,
+            pet.id,
+            pet.avatar,
+            settings.AVATAR_GC_GRACE_SECONDS,
+            replaced,
+        )
         
         return pet
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload avatar: {str(e)}")
 
@@ -1,136 +1,287 @@
 import uuid
-from typing import Any
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from datetime import datetime, timedelta, timezone
+from collections.abc import Sequence
+from typing import Annotated, Any, cast
+from fastapi import APIRouter, Body, HTTPException, Query
+from sqlalchemy import orm, update
+from sqlmodel import Session, col, select
 
-from app.api.deps import CurrentUser, SessionDep
+from app import crud
+from app.api.deps import (
+    AsyncReadSessionDep,
+    AsyncSessionDep,
+    CurrentPrincipal,
+    acheck_pet_owner,
+)
+from app.core.config import settings
+from app.api.pagination import acount_rows, apaginate
 from app.model.reminder import Reminder, ReminderCreate, ReminderPublic, RemindersPublic, ReminderUpdate
+from app.core.recurrence import RULE_FIELDS
 from app.model.pet import Pet
+from app.model.reminder_occurrence import (
+    ReminderOccurrence,
+    ReminderOccurrencePublic,
+    ReminderOccurrencesPublic,
+)
 from app.models import Message
 
 router = APIRouter(prefix="/reminders", tags=["reminders"])
 
 
+def _horizon() -> tuple[datetime, datetime]:
+    now = datetime.utcnow()
+    return now, now + timedelta(days=settings.REMINDER_HORIZON_DAYS)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # fire_at is naive UTC like every other timestamp column
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# run_sync helpers. AsyncSession.run_sync is typed as passing SQLAlchemy's
+# Session; the one it hands over is SQLModel's, which crud expects
+def _schedule(
+    sync_session: orm.Session,
+    /,
+    reminders: list[Reminder],
+    start: datetime,
+    until: datetime,
+    replace: bool = False,
+) -> None:
+    crud.schedule_reminders(
+        session=cast(Session, sync_session),
+        reminders=reminders,
+        start=start,
+        until=until,
+        replace=replace,
+    )
+
+
+def _create_and_schedule(
+    sync_session: orm.Session, /, reminders: list[Reminder]
+) -> list[Reminder]:
+    session = cast(Session, sync_session)
+    created = crud.create_many(session=session, db_objs=reminders)
+    now, until = _horizon()
+    crud.schedule_reminders(session=session, reminders=created, start=now, until=until)
+    # Only now, so the horizon job fills in occurrences if this didn't get here
+    session.exec(  # type: ignore
+        update(Reminder)
+        .where(col(Reminder.id).in_([reminder.id for reminder in created]))
+        .values(occurrences_until=until, updated_at=Reminder.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return created
+
+
 @router.get("/", response_model=RemindersPublic)
-def read_reminders(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+async def read_reminders(
+    session: AsyncReadSessionDep,
+    current_user: CurrentPrincipal,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool | None = None,
 ) -> Any:
     """
     Retrieve reminders for current user's pets.
     """
     # Get user's pet IDs first
-    user_pets = session.exec(select(Pet.id).where(Pet.user_id == current_user.id)).all()
-    
-    count_statement = select(func.count()).select_from(Reminder).where(Reminder.pet_id.in_(user_pets))
-    count = session.exec(count_statement).one()
+    user_pets = (await session.exec(select(Pet.id).where(Pet.user_id == current_user.id))).all()
     
-    statement = select(Reminder).where(Reminder.pet_id.in_(user_pets)).offset(skip).limit(limit)
-    reminders = session.exec(statement).all()
+    statement = select(Reminder).where(Reminder.pet_id.in_(user_pets))
+    if include_count is None:
+        include_count = cursor is None
+    count = await acount_rows(session, statement) if include_count else None
+    reminders, next_cursor = await apaginate(
+        session, statement, Reminder, skip=skip, limit=limit, cursor=cursor
+    )
     
-    return RemindersPublic(data=reminders, count=count)
+    return RemindersPublic(data=reminders, count=count, next_cursor=next_cursor)
+
+
+@router.get("/upcoming", response_model=ReminderOccurrencesPublic)
+async def read_upcoming_reminders(
+    session: AsyncReadSessionDep,
+    current_user: CurrentPrincipal,
+    from_: Annotated[datetime | None, Query(alias="from")] = None,
+    to: datetime | None = None,
+    pet_id: uuid.UUID | None = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+) -> Any:
+    """
+    Reminder occurrences from `from` (default now) until `to` (default a week
+    later), soonest first. Occurrences exist for the next
+    REMINDER_HORIZON_DAYS only.
+
+    `fire_at` is naive UTC: each reminder's wall-clock schedule is converted
+    from its `timezone` when materialised. `from` and `to` with an offset are
+    converted to UTC; without one they are taken as UTC.
+    """
+    start = _naive_utc(from_) if from_ else datetime.utcnow()
+    end = _naive_utc(to) if to else start + timedelta(days=7)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+
+    pet_ids: Sequence[uuid.UUID]
+    if pet_id is not None:
+        await acheck_pet_owner(session, current_user, pet_id)
+        pet_ids = [pet_id]
+    else:
+        pet_ids = (await session.exec(select(Pet.id).where(Pet.user_id == current_user.id))).all()
+
+    # A range scan of (pet_id, fire_at) per pet
+    statement = (
+        select(ReminderOccurrence.fire_at, Reminder)
+        .join(Reminder, col(Reminder.id) == ReminderOccurrence.reminder_id)
+        .where(
+            col(ReminderOccurrence.pet_id).in_(pet_ids),
+            col(ReminderOccurrence.fire_at) >= start,
+            col(ReminderOccurrence.fire_at) < end,
+        )
+        .order_by(col(ReminderOccurrence.fire_at), col(ReminderOccurrence.reminder_id))
+        .limit(limit)
+    )
+    rows = (await session.exec(statement)).all()
+    data = [
+        ReminderOccurrencePublic(fire_at=fire_at, reminder=ReminderPublic.model_validate(reminder))
+        for fire_at, reminder in rows
+    ]
+    return ReminderOccurrencesPublic(data=data, count=len(data))
 
 
 @router.get("/{id}", response_model=ReminderPublic)
-def read_reminder(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+async def read_reminder(session: AsyncReadSessionDep, current_user: CurrentPrincipal, id: uuid.UUID) -> Any:
     """
     Get reminder by ID.
     """
-    reminder = session.get(Reminder, id)
+    reminder = await session.get(Reminder, id)
     if not reminder:
         raise HTTPException(status_code=404, detail="Reminder not found")
     
     # Check if pet belongs to current user
-    pet = session.get(Pet, reminder.pet_id)
-    if not pet or pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
+    await acheck_pet_owner(session, current_user, reminder.pet_id)
     
     return reminder
 
 
 @router.post("/", response_model=ReminderPublic)
-def create_reminder(
-    *, session: SessionDep, current_user: CurrentUser, reminder_in: ReminderCreate, pet_id: uuid.UUID
+async def create_reminder(
+    *, session: AsyncSessionDep, current_user: CurrentPrincipal, reminder_in: ReminderCreate, pet_id: uuid.UUID
 ) -> Any:
     """
     Create new reminder for a pet.
     """
     # Verify pet belongs to current user
-    pet = session.get(Pet, pet_id)
-    if not pet or pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Pet not found or not enough permissions")
+    await acheck_pet_owner(session, current_user, pet_id)
     
-    reminder = Reminder.model_validate(reminder_in, update={"pet_id": pet_id})
+    now, until = _horizon()
+    # Set before the flush in schedule_reminders, so it's part of the INSERT
+    reminder = Reminder.model_validate(
+        reminder_in, update={"pet_id": pet_id, "occurrences_until": until}
+    )
     session.add(reminder)
-    session.commit()
-    session.refresh(reminder)
+    await session.run_sync(_schedule, [reminder], now, until)
+    await session.commit()
     return reminder
 
 
+@router.post("/pet/{pet_id}:batch", response_model=list[ReminderPublic])
+async def create_reminders_batch(
+    *,
+    session: AsyncSessionDep,
+    current_user: CurrentPrincipal,
+    pet_id: uuid.UUID,
+    reminders_in: Annotated[
+        list[ReminderCreate], Body(min_length=1, max_length=settings.BATCH_MAX_SIZE)
+    ],
+) -> Any:
+    """
+    Create several reminders for a pet at once.
+    """
+    # Verify pet belongs to current user
+    await acheck_pet_owner(session, current_user, pet_id)
+
+    reminders = [
+        Reminder.model_validate(reminder_in, update={"pet_id": pet_id})
+        for reminder_in in reminders_in
+    ]
+    return await session.run_sync(_create_and_schedule, reminders)
+
+
 @router.patch("/{id}", response_model=ReminderPublic)
-def update_reminder(
+async def update_reminder(
     *,
-    session: SessionDep,
-    current_user: CurrentUser,
+    session: AsyncSessionDep,
+    current_user: CurrentPrincipal,
     id: uuid.UUID,
     reminder_in: ReminderUpdate,
 ) -> Any:
     """
     Update a reminder.
     """
-    reminder = session.get(Reminder, id)
+    reminder = await session.get(Reminder, id)
     if not reminder:
         raise HTTPException(status_code=404, detail="Reminder not found")
     
     # Check if pet belongs to current user
-    pet = session.get(Pet, reminder.pet_id)
-    if not pet or pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
+    await acheck_pet_owner(session, current_user, reminder.pet_id)
     
     update_dict = reminder_in.model_dump(exclude_unset=True)
     reminder.sqlmodel_update(update_dict)
     session.add(reminder)
-    session.commit()
-    session.refresh(reminder)
+    if RULE_FIELDS.intersection(update_dict):
+        now, until = _horizon()
+        reminder.occurrences_until = until
+        await session.run_sync(_schedule, [reminder], now, until, True)
+    await session.commit()
     return reminder
 
 
 @router.delete("/{id}")
-def delete_reminder(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def delete_reminder(
+    session: AsyncSessionDep, current_user: CurrentPrincipal, id: uuid.UUID
 ) -> Message:
     """
     Delete a reminder.
     """
-    reminder = session.get(Reminder, id)
+    reminder = await session.get(Reminder, id)
     if not reminder:
         raise HTTPException(status_code=404, detail="Reminder not found")
     
     # Check if pet belongs to current user
-    pet = session.get(Pet, reminder.pet_id)
-    if not pet or pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Not enough permissions")
+    await acheck_pet_owner(session, current_user, reminder.pet_id)
     
-    session.delete(reminder)
-    session.commit()
+    await session.delete(reminder)
+    await session.commit()
     return Message(message="Reminder deleted successfully")
 
 
 @router.get("/pet/{pet_id}", response_model=RemindersPublic)
-def read_pet_reminders(
-    session: SessionDep, current_user: CurrentUser, pet_id: uuid.UUID, skip: int = 0, limit: int = 100
+async def read_pet_reminders(
+    session: AsyncReadSessionDep,
+    current_user: CurrentPrincipal,
+    pet_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool | None = None,
 ) -> Any:
     """
     Get all reminders for a specific pet.
     """
     # Verify pet belongs to current user
-    pet = session.get(Pet, pet_id)
-    if not pet or pet.user_id != current_user.id:
-        raise HTTPException(status_code=400, detail="Pet not found or not enough permissions")
-    
-    count_statement = select(func.count()).select_from(Reminder).where(Reminder.pet_id == pet_id)
-    count = session.exec(count_statement).one()
+    await acheck_pet_owner(session, current_user, pet_id)
     
-    statement = select(Reminder).where(Reminder.pet_id == pet_id).offset(skip).limit(limit)
-    reminders = session.exec(statement).all()
+    statement = select(Reminder).where(Reminder.pet_id == pet_id)
+    if include_count is None:
+        include_count = cursor is None
+    count = await acount_rows(session, statement) if include_count else None
+    reminders, next_cursor = await apaginate(
+        session, statement, Reminder, skip=skip, limit=limit, cursor=cursor
+    )
     
-    return RemindersPublic(data=reminders, count=count)
+    return RemindersPublic(data=reminders, count=count, next_cursor=next_cursor)
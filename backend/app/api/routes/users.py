@@ -4,7 +4,7 @@ from typing import Any
 import os
 from pathlib import Path
 from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
-from sqlmodel import col, delete, func, select
+from sqlmodel import col, delete, select
 
 from app import crud
 from app.api.deps import (
@@ -12,7 +12,9 @@ from app.api.deps import (
     SessionDep,
     get_current_active_superuser,
 )
+from app.api.pagination import count_rows, paginate
 from app.core.config import settings
+from app.core.principal import principal_cache
 from app.core.security import get_password_hash, verify_password
 from app.model.user import (
     UpdatePassword,
@@ -36,18 +38,26 @@ router = APIRouter(prefix="/users", tags=["users"])
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(
+    session: SessionDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool | None = None,
+) -> Any:
     """
     Retrieve users.
     """
 
-    count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
-
-    statement = select(User).offset(skip).limit(limit)
-    users = session.exec(statement).all()
+    statement = select(User)
+    if include_count is None:
+        include_count = cursor is None
+    count = count_rows(session, statement) if include_count else None
+    users, next_cursor = paginate(
+        session, statement, User, skip=skip, limit=limit, cursor=cursor
+    )
 
-    return UsersPublic(data=users, count=count)
+    return UsersPublic(data=users, count=count, next_cursor=next_cursor)
 
 
 @router.post(
@@ -95,6 +105,7 @@ def update_user_me(
     current_user.sqlmodel_update(user_data)
     session.add(current_user)
     session.commit()
+    principal_cache.invalidate(current_user.id)
     session.refresh(current_user)
     return current_user
 
@@ -116,6 +127,7 @@ def update_password_me(
     current_user.hashed_password = hashed_password
     session.add(current_user)
     session.commit()
+    principal_cache.invalidate(current_user.id)
     return Message(message="Password updated successfully")
 
 
@@ -136,8 +148,10 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
+    user_id = current_user.id
     session.delete(current_user)
     session.commit()
+    principal_cache.invalidate(user_id)
     return Message(message="User deleted successfully")
 
 
@@ -217,6 +231,7 @@ def update_user(
             )
 
     db_user = crud.update_user(session=session, db_user=db_user, user_in=user_in)
+    principal_cache.invalidate(user_id)
     return db_user
 
 
@@ -238,6 +253,7 @@ def delete_user(
     session.exec(statement)  # type: ignore
     session.delete(user)
     session.commit()
+    principal_cache.invalidate(user_id)
     return Message(message="User deleted successfully")
 
 
@@ -1,26 +1,38 @@
+import asyncio
 import base64
 import json
 import os
-import cv2
-import numpy as np
-from pyzbar.pyzbar import decode
 import requests
 import logging
-from typing import Optional
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Annotated, Any, Optional, cast
 
 import uuid
 from app.model.pet import Pet
 
 from dotenv import load_dotenv
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Body, Depends, HTTPException, UploadFile, File, Form
 from pydantic.networks import EmailStr
 
 from langchain_openai import ChatOpenAI
-from app.api.deps import get_current_active_superuser, SessionDep, CurrentUser
+from sqlalchemy import orm
+from sqlmodel import Session, select
+from app import crud
+from app.api.deps import get_current_active_superuser, AsyncSessionDep, SessionDep, CurrentUser
+from app.core.avatars import collect_orphaned_avatars
+from app.core.barcodes import barcode_decoder
+from app.core.config import settings
+from app.core.db import async_engine, async_pool_stats, engine, pool_stats
+from app.core.debug_capture import debug_capture
+from app.core.replicas import replica_router
+from app.core.images import food_analysis_cache, prepare_for_vision
+from app.core.llm import llm_limiter
 from app.core.prompt import Prompt
 from app.models import Message, Pet
 from app.utils import generate_test_email, send_email
 from app.model.food_scan_result import FoodScanResult, FoodScanResultCreate
+from app.model.barcode_product import BarcodeProduct, BarcodeProductCreate
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -66,6 +78,80 @@ def test_email(email_to: EmailStr) -> Message:
 async def health_check() -> bool:
     return True
 
+
+# Bump when the food analysis prompt changes so cached analyses are not reused
+FOOD_ANALYSIS_VERSION = 1
+
+
+async def _request_food_analysis(image_data: bytes) -> dict[str, Any]:
+    """Ask the vision model to analyze a food image and parse its JSON answer"""
+    try:
+        jpeg_data = await asyncio.to_thread(
+            prepare_for_vision,
+            image_data,
+            settings.VISION_IMAGE_MAX_DIMENSION,
+            settings.VISION_IMAGE_JPEG_QUALITY,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    base64_image = base64.b64encode(jpeg_data).decode('utf-8')
+    
+    # Create enhanced system prompt
+    system_prompt = Prompt.Image_Analyze_Prompt
+
+    # Create user message
+    user_text = """
+        Analyze this food image with maximum precision. Identify ALL food items (including components of mixed dishes),
+        provide precise nutritional values, detect reference objects, and estimate portion sizes with high accuracy. 
+        In some cases, even if the image quality is poor, analysis must be required. If the image is difficult to analyze, even a similar value should be returned.
+        Include spatial relationships between items and confidence scores for each identification.
+    """
+
+    # Generate response using OpenAI
+    from langchain_core.messages import HumanMessage
+    
+    message = HumanMessage(
+        content=[
+            {"type": "text", "text": user_text},
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}
+            }
+        ]
+    )
+
+    # Use the existing OpenAI client with vision capabilities
+    async with llm_limiter.slot():
+        response = await openai_llm.ainvoke([
+            ("system", system_prompt),
+            message
+        ])
+    
+    print("AI response: ", response)
+
+    # Parse JSON response
+    try:
+        result: dict[str, Any] = json.loads(response.content)
+    except json.JSONDecodeError:
+        # If response is not valid JSON, try to extract JSON from the response
+        import re
+        json_match = re.search(r'\{.*\}', response.content, re.DOTALL)
+        if json_match:
+            result = json.loads(json_match.group())
+        else:
+            raise HTTPException(status_code=500, detail="Failed to parse AI response as JSON")
+
+    # Ensure hasMultipleItems field exists
+    if "hasMultipleItems" not in result and "foodItems" in result:
+        result["hasMultipleItems"] = len(result["foodItems"]) > 1
+
+    # Calculate nutrition health score if missing
+    if "nutritionHealthScore" not in result and "foodItems" in result:
+        result["nutritionHealthScore"] = _calculate_nutrition_health_score(result["foodItems"])
+
+    return result
+
+
 @router.post("/analyze-food-image")
 async def analyze_food_image(
     session: SessionDep,
@@ -82,67 +168,20 @@ async def analyze_food_image(
         if not pet:
             raise HTTPException(status_code=404, detail="Pet not found")
         
-        # Read and encode image
+        # Read image
         image_data = await file.read()
-        public_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "public")
-        os.makedirs(public_dir, exist_ok=True)
-        image_path = os.path.join(public_dir, "test.png")
-        with open(image_path, "wb") as f:
-            f.write(image_data)
+        debug_capture.capture("food", image_data)
             
-        base64_image = base64.b64encode(image_data).decode('utf-8')
-        
-        # Create enhanced system prompt
-        system_prompt = Prompt.Image_Analyze_Prompt
-
-        # Create user message
-        user_text = """
-            Analyze this food image with maximum precision. Identify ALL food items (including components of mixed dishes),
-            provide precise nutritional values, detect reference objects, and estimate portion sizes with high accuracy. 
-            In some cases, even if the image quality is poor, analysis must be required. If the image is difficult to analyze, even a similar value should be returned.
-            Include spatial relationships between items and confidence scores for each identification.
-        """
-
-        # Generate response using OpenAI
-        from langchain_core.messages import HumanMessage
-        
-        message = HumanMessage(
-            content=[
-                {"type": "text", "text": user_text},
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}
-                }
-            ]
+        # Re-uploads of an already analyzed photo reuse the earlier analysis
+        analysis_version = f"{OPENAI_MODEL_NAME}:{FOOD_ANALYSIS_VERSION}"
+        result = await asyncio.to_thread(
+            food_analysis_cache.get, image_data, analysis_version
         )
-
-        # Use the existing OpenAI client with vision capabilities
-        response = openai_llm.invoke([
-            ("system", system_prompt),
-            message
-        ])
-        
-        print("AI response: ", response)
-
-        # Parse JSON response
-        try:
-            result = json.loads(response.content)
-        except json.JSONDecodeError:
-            # If response is not valid JSON, try to extract JSON from the response
-            import re
-            json_match = re.search(r'\{.*\}', response.content, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-            else:
-                raise HTTPException(status_code=500, detail="Failed to parse AI response as JSON")
-
-        # Ensure hasMultipleItems field exists
-        if "hasMultipleItems" not in result and "foodItems" in result:
-            result["hasMultipleItems"] = len(result["foodItems"]) > 1
-
-        # Calculate nutrition health score if missing
-        if "nutritionHealthScore" not in result and "foodItems" in result:
-            result["nutritionHealthScore"] = _calculate_nutrition_health_score(result["foodItems"])
+        if result is None:
+            result = await _request_food_analysis(image_data)
+            await asyncio.to_thread(
+                food_analysis_cache.set, image_data, analysis_version, result
+            )
 
         # After getting the result, save to database
         if "foodItems" in result and result["foodItems"]:
@@ -176,6 +215,8 @@ async def analyze_food_image(
 
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to analyze food image: {str(e)}")
 
@@ -207,8 +248,60 @@ def _calculate_nutrition_health_score(food_items):
     
     return max(0, min(100, int(score)))
 
+# Bump when the barcode prompt changes so older generated products are refreshed
+BARCODE_PRODUCT_VERSION = 1
+
+
+@dataclass
+class BarcodeCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses + self.stale
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+barcode_cache_stats = BarcodeCacheStats()
+
+
+def _is_fresh(product: BarcodeProduct) -> bool:
+    if product.version != BARCODE_PRODUCT_VERSION:
+        return False
+    return product.expires_at is None or product.expires_at > datetime.utcnow()
+
+
+# run_sync helpers. AsyncSession.run_sync is typed as passing SQLAlchemy's
+# Session; the one it hands over is SQLModel's, which crud expects
+def _get_barcode_product(
+    sync_session: orm.Session, /, barcode_data: str, barcode_type: str
+) -> BarcodeProduct | None:
+    return crud.get_barcode_product(
+        session=cast(Session, sync_session),
+        barcode_data=barcode_data,
+        barcode_type=barcode_type,
+    )
+
+
+def _save_barcode_product(
+    sync_session: orm.Session, /, product_in: BarcodeProductCreate, expires_at: datetime
+) -> None:
+    crud.save_barcode_products(
+        session=cast(Session, sync_session),
+        products_in=[product_in],
+        version=BARCODE_PRODUCT_VERSION,
+        expires_at=expires_at,
+    )
+
+
 @router.post("/scan-barcode")
-async def scan_barcode(file: UploadFile = File(...)):
+async def scan_barcode(session: AsyncSessionDep, file: UploadFile = File(...)):
     """
     Scan barcode from image and retrieve product data using OpenAI
     """
@@ -216,39 +309,40 @@ async def scan_barcode(file: UploadFile = File(...)):
         # Read and decode image
         image_data = await file.read()
 
-        public_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "public")
-        os.makedirs(public_dir, exist_ok=True)
-        image_path = os.path.join(public_dir, "test_barcode.png")
-        with open(image_path, "wb") as f:
-            f.write(image_data)
-        
-        # Convert bytes to numpy array
-        nparr = np.frombuffer(image_data, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if image is None:
-            raise HTTPException(status_code=400, detail="Invalid image format")
-        
-        # Detect barcodes directly on color image (pyzbar works with both color and grayscale)
-        barcodes = decode(image)
+        debug_capture.capture("barcode", image_data)
         
-        if not barcodes:
-            # Try with grayscale if color detection fails
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            barcodes = decode(gray)
-            
-        if not barcodes:
+        # Decode off the event loop; strategies escalate until one finds a barcode
+        try:
+            barcode = await barcode_decoder.decode(image_data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if barcode is None:
             raise HTTPException(
                 status_code=404, 
                 detail="No barcode detected in the image"
             )
         
-        # Get the first barcode found
-        barcode = barcodes[0]
-        barcode_data = barcode.data.decode('utf-8')
+        barcode_data = barcode.data
         barcode_type = barcode.type
         
         logger.info(f"Detected barcode: {barcode_data} (Type: {barcode_type})")
+
+        # Reuse the product generated for an earlier scan of this barcode
+        cached_product = await session.run_sync(
+            _get_barcode_product, barcode_data, barcode_type
+        )
+        if cached_product and _is_fresh(cached_product):
+            barcode_cache_stats.hits += 1
+            return {
+                "success": True,
+                "message": "Barcode scanned successfully",
+                "data": cached_product.product_data
+            }
+        if cached_product:
+            barcode_cache_stats.stale += 1
+        else:
+            barcode_cache_stats.misses += 1
         
         # Create system prompt for barcode analysis
         system_prompt = """
@@ -406,10 +500,11 @@ async def scan_barcode(file: UploadFile = File(...)):
         user_message = f"Barcode: {barcode_data}\nBarcode Type: {barcode_type}"
         
         # Generate response using OpenAI
-        response = openai_llm.invoke([
-            ("system", system_prompt),
-            ("user", user_message)
-        ])
+        async with llm_limiter.slot():
+            response = await openai_llm.ainvoke([
+                ("system", system_prompt),
+                ("user", user_message)
+            ])
         
         print("AI response: ", response)
         
@@ -434,6 +529,14 @@ async def scan_barcode(file: UploadFile = File(...)):
         logger.info(f"Nutrition Facts: {product_data['nutrition_facts']}")
         logger.info(f"Full Product Data: {json.dumps(product_data, indent=2)}")
         logger.info("=== END DEBUG OUTPUT ===")
+
+        product_in = BarcodeProductCreate(
+            barcode_data=barcode_data,
+            barcode_type=barcode_type,
+            product_data=product_data,
+        )
+        expires_at = datetime.utcnow() + timedelta(days=settings.BARCODE_PRODUCT_TTL_DAYS)
+        await session.run_sync(_save_barcode_product, product_in, expires_at)
         
         return {
             "success": True,
@@ -451,3 +554,83 @@ async def scan_barcode(file: UploadFile = File(...)):
         )
 
 
+@router.post(
+    "/barcode-products/import",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def import_barcode_products(
+    session: SessionDep,
+    data: Annotated[
+        list[BarcodeProductCreate],
+        Body(embed=True, max_length=settings.BATCH_MAX_SIZE),
+    ],
+) -> Message:
+    """
+    Preload known products so their barcodes never need an AI lookup.
+    """
+    crud.save_barcode_products(
+        session=session,
+        products_in=data,
+        version=BARCODE_PRODUCT_VERSION,
+        expires_at=None,
+    )
+    return Message(message=f"Imported {len(data)} barcode products")
+
+
+@router.get(
+    "/barcode-products/stats",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def barcode_product_stats() -> dict[str, Any]:
+    """
+    Barcode product cache hit ratio and decode strategy stats for this worker.
+    """
+    return {**barcode_cache_stats.as_dict(), "decode": barcode_decoder.stats()}
+
+
+@router.get(
+    "/analyze-food-image/stats",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def food_analysis_cache_stats() -> dict[str, Any]:
+    """
+    Food image analysis cache hit rate for this worker.
+    """
+    return food_analysis_cache.stats()
+
+
+@router.get(
+    "/db/pool-stats",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def db_pool_stats() -> dict[str, Any]:
+    """
+    Connection pool usage, checkout latency and read replica routing for this
+    worker.
+    """
+    stats: dict[str, Any] = {
+        "sync": {"status": engine.pool.status(), **pool_stats.as_dict()}
+    }
+    if async_engine is not None:
+        stats["async"] = {
+            "status": async_engine.pool.status(),
+            **async_pool_stats.as_dict(),
+        }
+    stats["read_routing"] = replica_router.stats()
+    return stats
+
+
+@router.post(
+    "/avatars/gc",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def collect_avatar_garbage(session: SessionDep) -> Message:
+    """
+    Delete avatar files that no pet references any more.
+    """
+    avatars = {
+        str(pet_id): avatar
+        for pet_id, avatar in session.exec(select(Pet.id, Pet.avatar)).all()
+    }
+    removed = collect_orphaned_avatars(avatars, settings.AVATAR_GC_GRACE_SECONDS)
+    return Message(message=f"Removed {removed} orphaned avatar files")
@@ -0,0 +1,280 @@
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, PathLike, StaticFiles
+from starlette.types import Scope
+
+from app.core.config import settings
+from app.core.debug_capture import debug_capture
+from app.core.images import content_hash, fit_within, sniff_image_type
+
+AVATAR_DIR = Path("upload/images/avatar")
+AVATAR_URI_PREFIX = "/images/avatar"
+CHUNK_SIZE = 64 * 1024
+DIGEST_LENGTH = 32
+VERSIONED_AVATAR_PATH = re.compile(
+    rf"/images/avatar/[^/]+/([0-9a-f]{{{DIGEST_LENGTH}}})/[^/]+$"
+)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Rendition name -> longest side in pixels
+RENDITIONS = {"thumbnail": 128, "medium": 512, "full": 1024}
+ENCODINGS = {
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY),
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+}
+
+_avatar_executor: ThreadPoolExecutor | None = None
+
+
+def get_avatar_executor() -> ThreadPoolExecutor:
+    """
+    The thread pool avatars are rendered in, started on first use. cv2
+    releases the GIL while decoding, resizing and encoding, so threads render
+    avatars in parallel without blocking the event loop.
+    """
+    global _avatar_executor
+    if _avatar_executor is None:
+        _avatar_executor = ThreadPoolExecutor(
+            max_workers=settings.AVATAR_WORKERS, thread_name_prefix="avatar"
+        )
+    return _avatar_executor
+
+
+def shutdown_avatar_executor() -> None:
+    # The next render starts a new pool, e.g. when the app is started again
+    global _avatar_executor
+    if _avatar_executor is not None:
+        _avatar_executor.shutdown()
+        _avatar_executor = None
+
+
+async def spool_upload(file: UploadFile, max_bytes: int) -> Path:
+    """
+    Copy an upload to a temporary file in chunks, rejecting it as soon as the
+    first chunk isn't a known image format or the size passes `max_bytes`.
+    The caller owns the returned file and must remove it.
+    """
+    fd, name = tempfile.mkstemp(prefix="avatar-", suffix=".upload")
+    path = Path(name)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            while chunk := await file.read(CHUNK_SIZE):
+                if size == 0 and sniff_image_type(chunk[:16]) is None:
+                    raise HTTPException(
+                        status_code=400, detail="File must be a JPEG, PNG or WebP image"
+                    )
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail="Image is too large")
+                await asyncio.to_thread(spool.write, chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Empty file")
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """
+    Write to a sibling temp file and rename it over `path`, so readers see
+    either the old file or the complete new one.
+    """
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def render_avatar(source: Path, pet_dir: Path, image_format: str, quality: int) -> str:
+    """
+    Encode every rendition of the image at `source` into a version directory
+    under `pet_dir` named after the full rendition's content hash, and return
+    the full rendition's path relative to `pet_dir`. CPU bound.
+    """
+    # imread applies the EXIF orientation, so renditions come out upright
+    image = cv2.imread(str(source), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Invalid image format")
+    extension, quality_flag = ENCODINGS[image_format]
+    encoded: dict[str, bytes] = {}
+    for name, max_dimension in RENDITIONS.items():
+        rendition = fit_within(image, max_dimension)
+        ok, buffer = cv2.imencode(extension, rendition, [quality_flag, quality])
+        if not ok:
+            raise ValueError("Failed to encode image")
+        encoded[name] = buffer.tobytes()
+
+    digest = content_hash(encoded["full"])[:DIGEST_LENGTH]
+    version_dir = pet_dir / digest
+    version_dir.mkdir(parents=True, exist_ok=True)
+    for name, data in encoded.items():
+        path = version_dir / f"{name}{extension}"
+        if not path.exists():
+            atomic_write(path, data)
+    # Re-uploading an old version makes it current again; keep GC off it
+    os.utime(version_dir)
+    return f"{digest}/full{extension}"
+
+
+async def save_avatar(file: UploadFile, pet_id: uuid.UUID) -> str:
+    """
+    Store the renditions of an uploaded avatar and return the URI of the
+    full-size one. The URI changes whenever the image does.
+    """
+    source = await spool_upload(file, settings.AVATAR_MAX_BYTES)
+    try:
+        await debug_capture.capture_file("avatar", source)
+        loop = asyncio.get_running_loop()
+        version = await loop.run_in_executor(
+            get_avatar_executor(),
+            render_avatar,
+            source,
+            AVATAR_DIR / str(pet_id),
+            settings.AVATAR_IMAGE_FORMAT,
+            settings.AVATAR_IMAGE_QUALITY,
+        )
+    finally:
+        await asyncio.to_thread(source.unlink, missing_ok=True)
+    return f"{AVATAR_URI_PREFIX}/{pet_id}/{version}"
+
+
+def _referenced_paths(avatar: str | None) -> set[Path]:
+    """
+    Files or version directories under AVATAR_DIR that a `Pet.avatar` URI uses.
+    """
+    if not avatar or not avatar.startswith(f"{AVATAR_URI_PREFIX}/"):
+        return set()
+    relative = Path(avatar.removeprefix(f"{AVATAR_URI_PREFIX}/"))
+    parts = relative.parts
+    if len(parts) == 3:
+        # {pet_id}/{digest}/{rendition}
+        return {AVATAR_DIR / parts[0] / parts[1]}
+    if len(parts) == 2:
+        # {pet_id}/{rendition}, written before avatars were versioned
+        return {
+            AVATAR_DIR / parts[0] / f"{name}{relative.suffix}" for name in RENDITIONS
+        }
+    # {pet_id}.png, written before avatars had renditions
+    return {AVATAR_DIR / relative}
+
+
+def _remove_stale(paths: list[Path], keep: set[Path], cutoff: float) -> int:
+    removed = 0
+    for path in paths:
+        if path in keep:
+            continue
+        try:
+            if path.stat().st_mtime > cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def _mark_replaced(paths: set[Path]) -> None:
+    # Version directories are never written to after they are rendered, so
+    # their mtime can carry the time they stopped being current
+    now = time.time()
+    for path in paths:
+        try:
+            os.utime(path, (now, now))
+        except FileNotFoundError:
+            pass
+
+
+def prune_avatar_versions(
+    pet_id: uuid.UUID,
+    avatar: str | None,
+    grace_seconds: float,
+    replaced: str | None = None,
+) -> int:
+    """
+    Remove a pet's avatar versions other than `avatar` that were replaced
+    more than `grace_seconds` ago, so clients still holding a recent URI can
+    load it. `replaced` is the avatar `avatar` just superseded; its grace
+    period starts now rather than when it was uploaded.
+    """
+    keep = _referenced_paths(avatar)
+    _mark_replaced(_referenced_paths(replaced) - keep)
+    pet_dir = AVATAR_DIR / str(pet_id)
+    paths = [AVATAR_DIR / f"{pet_id}.png"]
+    if pet_dir.is_dir():
+        paths.extend(pet_dir.iterdir())
+    return _remove_stale(paths, keep, time.time() - grace_seconds)
+
+
+def collect_orphaned_avatars(
+    avatars: Mapping[str, str | None], grace_seconds: float
+) -> int:
+    """
+    Sweep AVATAR_DIR given every pet's current avatar keyed by pet id:
+    removes unreferenced versions and the files of deleted pets.
+    """
+    if not AVATAR_DIR.is_dir():
+        return 0
+    cutoff = time.time() - grace_seconds
+    keep = set().union(*(_referenced_paths(avatar) for avatar in avatars.values()))
+    removed = 0
+    for entry in list(AVATAR_DIR.iterdir()):
+        pet_id = entry.name if entry.is_dir() else entry.stem
+        if pet_id in avatars and entry.is_dir():
+            removed += _remove_stale(list(entry.iterdir()), keep, cutoff)
+        else:
+            removed += _remove_stale([entry], keep, cutoff)
+    return removed
+
+
+def _avatar_digest(path: str) -> str | None:
+    match = VERSIONED_AVATAR_PATH.search(path)
+    return match.group(1) if match else None
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    Serves uploaded files. Versioned avatars never change under their URI, so
+    they get a strong ETag from their content hash and may be cached forever.
+    """
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        digest = _avatar_digest(Path(full_path).as_posix())
+        if digest is None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["etag"] = f'"{digest}-{Path(full_path).stem}"'
+        response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,177 @@
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any
+
+import cv2
+import numpy as np
+from pyzbar.pyzbar import decode
+
+from app.core.config import settings
+
+DOWNSCALE_MAX_DIMENSION = 1024
+
+
+@dataclass
+class DecodedBarcode:
+    data: str
+    type: str
+    strategy: str
+
+
+@dataclass
+class DecodeOutcome:
+    barcode: DecodedBarcode | None
+    # (strategy, seconds) for every strategy tried, in order
+    timings: list[tuple[str, float]]
+
+
+def _downscaled(gray: np.ndarray) -> np.ndarray:
+    height, width = gray.shape[:2]
+    scale = DOWNSCALE_MAX_DIMENSION / max(height, width)
+    if scale >= 1:
+        return gray
+    size = (round(width * scale), round(height * scale))
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+
+def _adaptive_threshold(gray: np.ndarray) -> np.ndarray:
+    return cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10
+    )
+
+
+def _rotated(gray: np.ndarray, angle: float) -> np.ndarray:
+    height, width = gray.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(gray, matrix, (width, height), borderValue=255)
+
+
+def _crops(gray: np.ndarray) -> Iterator[np.ndarray]:
+    height, width = gray.shape[:2]
+    yield gray[height // 5 : height * 4 // 5, width // 5 : width * 4 // 5]
+    yield gray[: height // 2, :]
+    yield gray[height // 2 :, :]
+
+
+def _strategies(image: np.ndarray) -> Iterator[tuple[str, Callable[[], list[np.ndarray]]]]:
+    """
+    Decoding attempts from cheapest to most expensive. Each yields the
+    candidate images for one strategy, built only if it is reached.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = _downscaled(gray)
+    yield "downscaled", lambda: [small]
+    yield "full", lambda: [image, gray] if small is not gray else [image]
+    yield "adaptive_threshold", lambda: [_adaptive_threshold(small)]
+    yield "rotation", lambda: [_rotated(small, angle) for angle in (45, -45)]
+    yield "roi_crop", lambda: list(_crops(gray))
+
+
+def decode_barcode(image_data: bytes) -> DecodeOutcome:
+    """
+    Find the first barcode in an encoded image, trying each strategy in turn
+    and stopping at the first hit. CPU bound; meant for the decode pool.
+    """
+    image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Invalid image format")
+
+    timings: list[tuple[str, float]] = []
+    for strategy, candidates in _strategies(image):
+        started = time.perf_counter()
+        barcodes: list[Any] = next(
+            (found for candidate in candidates() if (found := decode(candidate))),
+            [],
+        )
+        timings.append((strategy, time.perf_counter() - started))
+        if barcodes:
+            barcode = barcodes[0]
+            decoded = DecodedBarcode(
+                data=barcode.data.decode("utf-8"),
+                type=barcode.type,
+                strategy=strategy,
+            )
+            return DecodeOutcome(barcode=decoded, timings=timings)
+    return DecodeOutcome(barcode=None, timings=timings)
+
+
+@dataclass
+class StrategyStats:
+    attempts: int = 0
+    hits: int = 0
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def as_dict(self) -> dict[str, Any]:
+        ordered = sorted(self.samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+        return {
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "decode_rate": round(self.hits / self.attempts, 4) if self.attempts else 0.0,
+            "p95_ms": round(p95 * 1000, 2),
+        }
+
+
+class BarcodeDecoder:
+    """
+    Runs `decode_barcode` in a process pool so decoding never stalls the
+    event loop, and keeps per-strategy stats. Every API worker has its own
+    pool of `max_workers` processes.
+
+    A pool whose child died (a native crash on a bad image, an OOM kill) is
+    broken for good, so it's dropped and the next call starts a fresh one.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        decode_fn: Callable[[bytes], DecodeOutcome] = decode_barcode,
+    ) -> None:
+        self.max_workers = max_workers
+        self.decode_fn = decode_fn
+        self._pool: ProcessPoolExecutor | None = None
+        self.strategies: dict[str, StrategyStats] = {}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def decode(self, image_data: bytes) -> DecodedBarcode | None:
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        try:
+            outcome = await loop.run_in_executor(pool, self.decode_fn, image_data)
+        except BrokenProcessPool:
+            # Other requests on the same pool fail too; only the first resets it
+            if self._pool is pool:
+                self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        for strategy, seconds in outcome.timings:
+            stats = self.strategies.setdefault(strategy, StrategyStats())
+            stats.attempts += 1
+            stats.samples.append(seconds)
+        if outcome.barcode is not None:
+            self.strategies[outcome.barcode.strategy].hits += 1
+        return outcome.barcode
+
+    def stats(self) -> dict[str, Any]:
+        return {name: stats.as_dict() for name, stats in self.strategies.items()}
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+barcode_decoder = BarcodeDecoder(max_workers=settings.BARCODE_DECODE_WORKERS)
@@ -0,0 +1,121 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Protocol, TypeVar
+
+from app.core.config import settings
+
+V = TypeVar("V")
+
+
+class SharedCache(Protocol):
+    """
+    The subset of the redis-py client used for the shared cache tier, so a
+    real Redis (or anything speaking its API) and in-memory fakes both fit.
+    """
+
+    def get(self, name: str) -> Any: ...
+
+    def set(self, name: str, value: Any, ex: int | None = None) -> Any: ...
+
+    def delete(self, *names: str) -> Any: ...
+
+
+class LRUCache(Generic[V]):
+    """
+    Thread-safe in-process LRU cache with a per-entry TTL.
+
+    Entries past their TTL are treated as misses and dropped on access; once
+    `maxsize` is reached the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[str, tuple[float | None, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> V | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: V, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def items(self) -> list[tuple[str, V]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value)
+                for key, (expires_at, value) in self._data.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def hash_key(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+_shared_cache: SharedCache | None = None
+
+
+def get_shared_cache() -> SharedCache | None:
+    """
+    Return the Redis client for the shared cache tier, or None when
+    CACHE_REDIS_URL is not configured.
+    """
+    global _shared_cache
+    if _shared_cache is None and settings.CACHE_REDIS_URL:
+        import redis  # The `redis` extra; only needed with a shared tier
+
+        _shared_cache = redis.Redis.from_url(
+            settings.CACHE_REDIS_URL,
+            socket_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+        )
+    return _shared_cache
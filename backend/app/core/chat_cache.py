@@ -0,0 +1,98 @@
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.core.cache import LRUCache, hash_key, normalize_text
+from app.core.config import settings
+from app.core.rag import cached_openai_embeddings, rag_pipeline
+
+
+class ChatResponseCache:
+    """
+    Caches chat completions keyed on (system prompt, model, message).
+
+    Exact lookups use the normalised message text. When a similarity
+    threshold is set, a miss falls back to comparing the message embedding
+    against cached queries for the same prompt and model, so paraphrases of
+    an already answered question are served from the cache too.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int,
+        ttl: float | None,
+        similarity_threshold: float | None = None,
+        embeddings_factory: Callable[[], Embeddings] | None = None,
+    ) -> None:
+        self.responses: LRUCache[str] = LRUCache(maxsize=maxsize, ttl=ttl)
+        # exact key -> (scope, unit-length query vector, response)
+        self.vectors: LRUCache[tuple[str, np.ndarray, str]] = LRUCache(
+            maxsize=maxsize, ttl=ttl
+        )
+        self.similarity_threshold = similarity_threshold
+        self._embeddings_factory = embeddings_factory
+        self._embeddings: Embeddings | None = None
+        self.similar_hits = 0
+
+    @property
+    def semantic(self) -> bool:
+        return (
+            self.similarity_threshold is not None
+            and self._embeddings_factory is not None
+        )
+
+    async def _embed(self, message: str) -> np.ndarray:
+        if self._embeddings is None:
+            assert self._embeddings_factory is not None
+            self._embeddings = self._embeddings_factory()
+        vector = np.asarray(await self._embeddings.aembed_query(message))
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    @staticmethod
+    def _scope(system_prompt: str, model: str) -> str:
+        return hash_key(system_prompt, model)
+
+    async def aget(self, system_prompt: str, model: str, message: str) -> str | None:
+        scope = self._scope(system_prompt, model)
+        cached = self.responses.get(hash_key(scope, normalize_text(message)))
+        if cached is not None or not self.semantic:
+            return cached
+
+        candidates = [
+            (vector, response)
+            for _, (entry_scope, vector, response) in self.vectors.items()
+            if entry_scope == scope
+        ]
+        if not candidates:
+            return None
+        query = await self._embed(message)
+        scores = np.stack([vector for vector, _ in candidates]) @ query
+        best = int(np.argmax(scores))
+        assert self.similarity_threshold is not None
+        if scores[best] < self.similarity_threshold:
+            return None
+        self.similar_hits += 1
+        return candidates[best][1]
+
+    async def aset(
+        self, system_prompt: str, model: str, message: str, response: str
+    ) -> None:
+        scope = self._scope(system_prompt, model)
+        key = hash_key(scope, normalize_text(message))
+        self.responses.set(key, response)
+        if self.semantic:
+            self.vectors.set(key, (scope, await self._embed(message), response))
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.responses.stats(), "similar_hits": self.similar_hits}
+
+
+chat_response_cache = ChatResponseCache(
+    maxsize=settings.CHAT_CACHE_SIZE,
+    ttl=settings.CHAT_CACHE_TTL_SECONDS,
+    similarity_threshold=settings.CHAT_CACHE_SIMILARITY_THRESHOLD,
+    embeddings_factory=lambda: cached_openai_embeddings(rag_pipeline.embedding_cache),
+)
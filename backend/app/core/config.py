@@ -83,6 +83,30 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Serve the routes ported to AsyncSessionDep through psycopg's async
+    # driver; when off they run on the sync engine in the threadpool
+    ASYNC_DB_ENABLED: bool = False
+
+    # Per engine and worker, so with `--workers 4` the worst case is
+    # 4 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Behind PgBouncer in transaction mode: leave pooling to PgBouncer and
+    # turn off prepared statements, which don't survive a backend switch
+    DB_NULL_POOL: bool = False
+    DB_PREPARED_STATEMENTS: bool = True
+
+    # Optional streaming replicas (comma-separated SQLAlchemy URLs) serving
+    # the read-only routes while their lag stays under REPLICA_MAX_LAG_SECONDS.
+    # A user reads from the primary for REPLICA_STICKY_SECONDS after a write.
+    REPLICA_DATABASE_URIS: Annotated[list[str] | str, BeforeValidator(parse_cors)] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    REPLICA_LAG_CHECK_SECONDS: float = 5
+    REPLICA_STICKY_SECONDS: int = 10
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -100,6 +124,73 @@ class Settings(BaseSettings):
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
 
+    # Per-process cap on in-flight LLM calls, and how many more may wait for
+    # a slot before new requests are turned away with 429.
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_MAX_QUEUE: int = 32
+
+    # Optional Redis shared by all workers as a second cache tier. Calls that
+    # take longer than the timeout fail and are treated as cache misses
+    CACHE_REDIS_URL: str | None = None
+    CACHE_REDIS_TIMEOUT_SECONDS: float = 0.5
+    # Authenticated user id -> is_active/is_superuser, skipping the user lookup
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    # Pet id -> owner id for ownership checks; 0 disables the cache. Without
+    # the shared tier a pet deleted through another worker passes checks here
+    # for up to the TTL
+    PET_OWNER_CACHE_SIZE: int = 10_000
+    PET_OWNER_CACHE_TTL_SECONDS: int = 60
+    EMBEDDING_CACHE_SIZE: int = 10_000
+    EMBEDDING_CACHE_TTL_SECONDS: int = 60 * 60 * 24
+    CHAT_CACHE_SIZE: int = 1_000
+    CHAT_CACHE_TTL_SECONDS: int = 60 * 60
+    # Cosine similarity above which a cached answer is reused for a
+    # paraphrased question; unset keeps the chat cache exact-match only.
+    CHAT_CACHE_SIMILARITY_THRESHOLD: float | None = None
+    # Most records a single :batch request may create
+    BATCH_MAX_SIZE: int = 500
+    # Reminder occurrences are kept materialised this far ahead, topped up
+    # every REMINDER_HORIZON_REFRESH_SECONDS
+    REMINDER_HORIZON_DAYS: int = 30
+    REMINDER_HORIZON_REFRESH_SECONDS: int = 60 * 60
+    # app/reminder_dispatcher.py: every REMINDER_DISPATCH_POLL_SECONDS, hand
+    # occurrences due within the lookahead to REMINDER_NOTIFIER. Ones later
+    # than REMINDER_DISPATCH_MAX_LATENESS_SECONDS (dispatcher was down) are
+    # dropped rather than sent late.
+    REMINDER_NOTIFIER: Literal["log", "email"] = "log"
+    REMINDER_DISPATCH_POLL_SECONDS: float = 15
+    REMINDER_DISPATCH_LOOKAHEAD_SECONDS: int = 60
+    REMINDER_DISPATCH_BATCH_SIZE: int = 500
+    REMINDER_DISPATCH_MAX_LATENESS_SECONDS: int = 60 * 60
+    # Dispatched occurrences are deleted once this old
+    REMINDER_OCCURRENCE_RETENTION_DAYS: int = 7
+    BARCODE_PRODUCT_TTL_DAYS: int = 30
+    # Barcode decode processes per API worker, so `--workers 4` runs four
+    # times this many; keep workers * BARCODE_DECODE_WORKERS near the core count
+    BARCODE_DECODE_WORKERS: int = 2
+    FOOD_ANALYSIS_CACHE_SIZE: int = 512
+    FOOD_ANALYSIS_CACHE_TTL_SECONDS: int = 60 * 60 * 24 * 7
+    # Also match re-uploads whose dHash is within FOOD_ANALYSIS_HASH_DISTANCE bits
+    FOOD_ANALYSIS_PERCEPTUAL_HASH: bool = False
+    FOOD_ANALYSIS_HASH_DISTANCE: int = 4
+    # Uploads are downscaled to fit this box and re-encoded before vision calls
+    VISION_IMAGE_MAX_DIMENSION: int = 1024
+    VISION_IMAGE_JPEG_QUALITY: int = 85
+    AVATAR_MAX_BYTES: int = 10 * 1024 * 1024
+    AVATAR_IMAGE_FORMAT: Literal["webp", "jpeg"] = "webp"
+    AVATAR_IMAGE_QUALITY: int = 80
+    # Avatar rendition thread pool size; unset uses the executor default
+    AVATAR_WORKERS: int | None = None
+    # Replaced avatar versions are kept this long for clients with stale URIs
+    AVATAR_GC_GRACE_SECONDS: int = 60 * 60 * 24
+    # Save a sample of uploads for debugging; off in production
+    DEBUG_CAPTURE_ENABLED: bool = False
+    DEBUG_CAPTURE_SAMPLE_RATE: float = 0.01
+    DEBUG_CAPTURE_DIR: str | None = None
+    DEBUG_CAPTURE_MAX_BYTES: int = 10 * 1024 * 1024
+    DEBUG_CAPTURE_MAX_FILES: int = 200
+
     @computed_field
     @property
     def emails_enabled(self) -> bool:
@@ -1,11 +1,70 @@
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
 from sqlmodel import Session, create_engine, select, SQLModel
 
 from app import crud
 from app.core.config import settings
+from app.core.db_pool import PoolStats, engine_options, track_in_use
 from app.model.user import User, UserCreate
 from app.model.pet import Pet, PetCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+T = TypeVar("T")
+
+pool_stats = PoolStats()
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), **engine_options(QueuePool, pool_stats)
+)
+track_in_use(engine, pool_stats)
+
+# psycopg 3 is also the async driver, so the same URL serves both engines
+async_pool_stats = PoolStats()
+async_engine: AsyncEngine | None = None
+if settings.ASYNC_DB_ENABLED:
+    async_engine = create_async_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        **engine_options(AsyncAdaptedQueuePool, async_pool_stats),
+    )
+    track_in_use(async_engine.sync_engine, async_pool_stats)
+
+
+class ThreadpoolSession:
+    """
+    The awaitable subset of AsyncSession that async routes use, backed by a
+    sync Session whose calls run in the threadpool. Lets those routes run
+    unchanged while ASYNC_DB_ENABLED is off.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.sync_session = session
+
+    @property
+    def info(self) -> dict[Any, Any]:
+        return self.sync_session.info
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    async def exec(self, statement: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.exec, statement)
+
+    async def get(self, entity: Any, ident: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.get, entity, ident)
+
+    async def delete(self, instance: Any) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def refresh(self, instance: Any) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
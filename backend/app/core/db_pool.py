@@ -0,0 +1,96 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool, Pool, QueuePool
+
+from app.core.config import settings
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    overflow_hits: int = 0
+    timeouts: int = 0
+    in_use: int = 0
+    peak_in_use: int = 0
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def as_dict(self) -> dict[str, Any]:
+        ordered = sorted(self.samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+        return {
+            "checkouts": self.checkouts,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "overflow_hits": self.overflow_hits,
+            "timeouts": self.timeouts,
+            "checkout_p95_ms": round(p95 * 1000, 2),
+            "checkout_max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        }
+
+
+class _TimedCheckout:
+    """
+    Pool mixin that times how long getting a connection takes, i.e. the wait
+    for a free one plus connecting when the pool has to open a new one.
+    """
+
+    stats: PoolStats
+
+    def _do_get(self) -> Any:
+        overflow = self.overflow() if isinstance(self, QueuePool) else 0
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()  # type: ignore[misc]
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.samples.append(time.perf_counter() - start)
+        self.stats.checkouts += 1
+        if isinstance(self, QueuePool) and self.overflow() > max(overflow, 0):
+            self.stats.overflow_hits += 1
+        return record
+
+
+def instrumented_pool_class(base: type[Pool], stats: PoolStats) -> type[Pool]:
+    # A class per engine since Pool.recreate() (on dispose) rebuilds the pool
+    # from self.__class__ and would drop instance state
+    return type(f"Instrumented{base.__name__}", (_TimedCheckout, base), {"stats": stats})
+
+
+def engine_options(queue_pool: type[Pool], stats: PoolStats) -> dict[str, Any]:
+    """
+    create_engine() keyword arguments for the DB_POOL_* settings, with the
+    pool class swapped for one that records checkouts into `stats`.
+    """
+    options: dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if settings.DB_NULL_POOL:
+        options["poolclass"] = instrumented_pool_class(NullPool, stats)
+    else:
+        options.update(
+            poolclass=instrumented_pool_class(queue_pool, stats),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    if not settings.DB_PREPARED_STATEMENTS:
+        # psycopg prepares a statement after its 5th run by default
+        options["connect_args"] = {"prepare_threshold": None}
+    return options
+
+
+def track_in_use(engine: Engine, stats: PoolStats) -> None:
+    @event.listens_for(engine, "checkout")
+    def _checkout(*_args: Any) -> None:
+        stats.in_use += 1
+        stats.peak_in_use = max(stats.peak_in_use, stats.in_use)
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(*_args: Any) -> None:
+        stats.in_use -= 1
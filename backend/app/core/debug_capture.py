@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import random
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.images import sniff_image_type
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPTURE_DIR = Path(__file__).resolve().parent.parent / "public" / "debug"
+
+
+class DebugCapture:
+    """
+    Saves a sample of uploaded images for debugging.
+
+    Disabled, unsampled or oversized uploads return before touching the disk.
+    Sampled ones are written off the event loop under a unique per-request name,
+    and only the newest `max_files` captures are kept.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        sample_rate: float,
+        directory: Path,
+        max_bytes: int,
+        max_files: int,
+    ) -> None:
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._pending: set[asyncio.Task[None]] = set()
+
+    def _sampled(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    def capture(self, kind: str, data: bytes) -> None:
+        if not self._sampled() or len(data) > self.max_bytes:
+            return
+        task = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(self._write, kind, data)
+        )
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def capture_file(self, kind: str, path: Path) -> None:
+        """
+        Like `capture`, for an upload spooled to disk. Awaited, so the caller
+        can remove the file afterwards.
+        """
+        if not self._sampled():
+            return
+        if path.stat().st_size > self.max_bytes:
+            return
+        await asyncio.to_thread(lambda: self._write(kind, path.read_bytes()))
+
+    async def drain(self) -> None:
+        """
+        Wait for captures still being written.
+        """
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def _write(self, kind: str, data: bytes) -> None:
+        extension = sniff_image_type(data[:16]) or "bin"
+        timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        name = f"{kind}-{timestamp}-{uuid.uuid4().hex[:8]}.{extension}"
+        try:
+            with self._lock:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                (self.directory / name).write_bytes(data)
+                self._rotate()
+        except OSError as e:
+            logger.warning(f"Debug capture failed: {e}")
+
+    def _rotate(self) -> None:
+        captures = sorted(
+            (path for path in self.directory.iterdir() if path.is_file()),
+            key=lambda path: path.stat().st_mtime_ns,
+        )
+        for path in captures[: max(0, len(captures) - self.max_files)]:
+            path.unlink(missing_ok=True)
+
+
+debug_capture = DebugCapture(
+    enabled=settings.DEBUG_CAPTURE_ENABLED,
+    sample_rate=settings.DEBUG_CAPTURE_SAMPLE_RATE,
+    directory=Path(settings.DEBUG_CAPTURE_DIR) if settings.DEBUG_CAPTURE_DIR else DEFAULT_CAPTURE_DIR,
+    max_bytes=settings.DEBUG_CAPTURE_MAX_BYTES,
+    max_files=settings.DEBUG_CAPTURE_MAX_FILES,
+)
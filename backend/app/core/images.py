@@ -0,0 +1,152 @@
+import hashlib
+from typing import Any
+
+import cv2
+import numpy as np
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+
+# Leading bytes that identify the image formats we accept
+IMAGE_SIGNATURES: dict[str, tuple[bytes, ...]] = {
+    "jpeg": (b"\xff\xd8\xff",),
+    "png": (b"\x89PNG\r\n\x1a\n",),
+    "webp": (b"RIFF",),
+}
+
+
+def sniff_image_type(header: bytes) -> str | None:
+    """
+    Image format from the file's magic bytes, or None if it isn't one we accept.
+    """
+    for image_type, signatures in IMAGE_SIGNATURES.items():
+        if header.startswith(signatures):
+            if image_type == "webp" and header[8:12] != b"WEBP":
+                continue
+            return image_type
+    return None
+
+
+def content_hash(image_data: bytes) -> str:
+    return hashlib.sha256(image_data).hexdigest()
+
+
+def perceptual_hash(image_data: bytes) -> int | None:
+    """
+    64-bit difference hash (dHash) of an encoded image.
+
+    Recompressed or slightly resized copies of a photo hash to the same or
+    a very close value, unlike a content hash. Returns None if the bytes
+    can't be decoded as an image.
+    """
+    image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        return None
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def fit_within(image: np.ndarray, max_dimension: int) -> np.ndarray:
+    """
+    Downscale a decoded image, keeping its aspect ratio, so neither side
+    exceeds `max_dimension`. Smaller images are returned unchanged.
+    """
+    height, width = image.shape[:2]
+    scale = max_dimension / max(height, width)
+    if scale >= 1:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def prepare_for_vision(image_data: bytes, max_dimension: int, quality: int) -> bytes:
+    """
+    Re-encode an uploaded photo as a compact JPEG for the vision model.
+
+    `cv2.imdecode` applies the EXIF orientation, so the result is upright;
+    it is then downscaled to fit `max_dimension` and encoded at `quality`.
+    CPU bound, so run it off the event loop.
+    """
+    image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Invalid image format")
+    image = fit_within(image, max_dimension)
+    ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Failed to encode image")
+    return buffer.tobytes()
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class FoodAnalysisCache:
+    """
+    Bounded LRU of parsed food image analyses, keyed by image content hash
+    and model version.
+
+    With `perceptual` enabled, a content-hash miss also matches any cached
+    image whose dHash is within `max_distance` bits, so re-uploads that the
+    phone recompressed are still recognised.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int,
+        ttl: float | None,
+        perceptual: bool = False,
+        max_distance: int = 4,
+    ) -> None:
+        self.entries: LRUCache[tuple[str, int | None, dict[str, Any]]] = LRUCache(
+            maxsize=maxsize, ttl=ttl
+        )
+        self.perceptual = perceptual
+        self.max_distance = max_distance
+        self.perceptual_hits = 0
+
+    def get(self, image_data: bytes, version: str) -> dict[str, Any] | None:
+        entry = self.entries.get(f"{version}:{content_hash(image_data)}")
+        if entry is not None:
+            return entry[2]
+        if not self.perceptual:
+            return None
+        phash = perceptual_hash(image_data)
+        if phash is None:
+            return None
+        for _, (entry_version, entry_phash, analysis) in self.entries.items():
+            if (
+                entry_version == version
+                and entry_phash is not None
+                and hamming_distance(phash, entry_phash) <= self.max_distance
+            ):
+                self.perceptual_hits += 1
+                return analysis
+        return None
+
+    def set(self, image_data: bytes, version: str, analysis: dict[str, Any]) -> None:
+        phash = perceptual_hash(image_data) if self.perceptual else None
+        self.entries.set(
+            f"{version}:{content_hash(image_data)}", (version, phash, analysis)
+        )
+
+    def stats(self) -> dict[str, Any]:
+        stats = self.entries.stats()
+        hits = stats["hits"] + self.perceptual_hits
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "perceptual_hits": self.perceptual_hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+food_analysis_cache = FoodAnalysisCache(
+    maxsize=settings.FOOD_ANALYSIS_CACHE_SIZE,
+    ttl=settings.FOOD_ANALYSIS_CACHE_TTL_SECONDS,
+    perceptual=settings.FOOD_ANALYSIS_PERCEPTUAL_HASH,
+    max_distance=settings.FOOD_ANALYSIS_HASH_DISTANCE,
+)
@@ -0,0 +1,69 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+
+class LLMLimiter:
+    """
+    Bounds concurrent LLM calls within a worker process.
+
+    Up to `max_concurrency` calls run at once and up to `max_queue` more wait
+    for a slot; anything beyond that is rejected with 429 straight away
+    rather than piling up behind multi-second completions.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int) -> None:
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_pending = max_concurrency + max_queue
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def acquire(self) -> Callable[[], None]:
+        """
+        Take a slot for work that outlives the caller, such as a streamed
+        response. The returned release is idempotent, so every path that can
+        end the work may call it.
+        """
+        if self._pending >= self._max_pending:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many AI requests in progress, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            self._pending -= 1
+            raise
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self._semaphore.release()
+                self._pending -= 1
+
+        return release
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        release = await self.acquire()
+        try:
+            yield
+        finally:
+            release()
+
+
+llm_limiter = LLMLimiter(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+)
@@ -0,0 +1,91 @@
+import html
+import logging
+import uuid
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Protocol
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+from app.utils import send_email
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DueReminder:
+    occurrence_id: uuid.UUID
+    reminder_id: uuid.UUID
+    pet_id: uuid.UUID
+    user_id: uuid.UUID
+    email: str
+    pet_name: str
+    category: str
+    title: str | None
+    notes: str | None
+    dosage: str | None
+    # Naive UTC, materialised from the reminder's wall-clock time in
+    # `timezone`; may be up to the dispatch lookahead in the future
+    fire_at: datetime
+    timezone: str = "UTC"
+
+    @property
+    def local_fire_at(self) -> datetime:
+        """
+        fire_at as the wall-clock time the user set, with its tzinfo.
+        """
+        utc = self.fire_at.replace(tzinfo=ZoneInfo("UTC"))
+        return utc.astimezone(ZoneInfo(self.timezone))
+
+    @property
+    def subject(self) -> str:
+        return f"{self.pet_name}: {self.title or self.category}"
+
+
+class Notifier(Protocol):
+    """
+    Delivers a batch of due reminders. The occurrences stay locked while
+    `send` runs and are only marked dispatched if it returns, so raising
+    makes the whole batch come round again on the next poll.
+    """
+
+    def send(self, due: Sequence[DueReminder]) -> None: ...
+
+
+class LogNotifier:
+    def send(self, due: Sequence[DueReminder]) -> None:
+        for reminder in due:
+            logger.info(
+                f"Reminder {reminder.reminder_id} for {reminder.email} "
+                f"at {reminder.local_fire_at:%Y-%m-%d %H:%M %Z}: {reminder.subject}"
+            )
+
+
+class EmailNotifier:
+    def send(self, due: Sequence[DueReminder]) -> None:
+        for reminder in due:
+            lines = [reminder.title or reminder.category, reminder.dosage, reminder.notes]
+            html_content = "".join(
+                f"<p>{html.escape(line)}</p>" for line in lines if line
+            )
+            try:
+                send_email(
+                    email_to=reminder.email,
+                    subject=f"{settings.PROJECT_NAME} - {reminder.subject}",
+                    html_content=html_content,
+                )
+            except Exception as e:
+                # Dropped rather than failing the batch, which would resend
+                # the emails that did go out
+                logger.warning(f"Reminder email to {reminder.email} failed: {e}")
+
+
+NOTIFIERS: dict[str, Callable[[], Notifier]] = {
+    "log": LogNotifier,
+    "email": EmailNotifier,
+}
+
+
+def get_notifier(name: str | None = None) -> Notifier:
+    return NOTIFIERS[name or settings.REMINDER_NOTIFIER]()
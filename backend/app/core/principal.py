@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.core.cache import LRUCache, SharedCache, get_shared_cache
+from app.core.config import settings
+from app.model.user import User
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The parts of a user that authentication and authorization checks need.
+    """
+
+    id: uuid.UUID
+    is_active: bool
+    is_superuser: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, is_active=user.is_active, is_superuser=user.is_superuser)
+
+    def to_json(self) -> str:
+        return json.dumps({**asdict(self), "id": str(self.id)})
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "Principal":
+        data = json.loads(raw)
+        return cls(**{**data, "id": uuid.UUID(data["id"])})
+
+
+class PrincipalCache:
+    """
+    Short-lived cache of principals keyed by user id, so authenticated requests
+    don't load the user row.
+
+    With a shared backend every worker reads and invalidates the same entries;
+    otherwise each worker keeps its own bounded LRU and the TTL bounds how long
+    a change made through another worker can go unseen. A failing shared
+    backend reads as a miss, so authentication falls back to the database.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: int, shared: SharedCache | None = None) -> None:
+        self.local: LRUCache[Principal] = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.shared = shared
+
+    @staticmethod
+    def _key(user_id: uuid.UUID | str) -> str:
+        return f"principal:{user_id}"
+
+    def get(self, user_id: uuid.UUID | str) -> Principal | None:
+        key = self._key(user_id)
+        if self.shared is None:
+            return self.local.get(key)
+        try:
+            raw = self.shared.get(key)
+        except Exception as e:
+            logger.warning(f"Shared principal cache read failed: {e}")
+            return None
+        return Principal.from_json(raw) if raw is not None else None
+
+    def set(self, principal: Principal) -> None:
+        key = self._key(principal.id)
+        if self.shared is None:
+            self.local.set(key, principal)
+            return
+        try:
+            self.shared.set(key, principal.to_json(), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Shared principal cache write failed: {e}")
+
+    def invalidate(self, user_id: uuid.UUID | str) -> None:
+        key = self._key(user_id)
+        self.local.delete(key)
+        if self.shared is None:
+            return
+        try:
+            self.shared.delete(key)
+        except Exception as e:
+            # The entry expires within the TTL
+            logger.warning(f"Shared principal cache invalidation failed: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.local.stats(), "shared": self.shared is not None}
+
+
+class PetOwnerCache:
+    """
+    Pet id -> owner id for ownership checks, so they skip the pet lookup.
+
+    Owners never change, so entries only go stale when a pet is deleted.
+    With a shared backend the invalidation reaches every worker; otherwise
+    the TTL bounds how long other workers keep passing checks for a deleted
+    pet. A failing shared backend reads as a miss, so checks fall back to
+    the database.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: int, shared: SharedCache | None = None) -> None:
+        self.enabled = maxsize > 0
+        self.local: LRUCache[uuid.UUID] = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.shared = shared
+
+    @staticmethod
+    def _key(pet_id: uuid.UUID) -> str:
+        return f"pet_owner:{pet_id}"
+
+    def get(self, pet_id: uuid.UUID) -> uuid.UUID | None:
+        if not self.enabled:
+            return None
+        key = self._key(pet_id)
+        if self.shared is None:
+            return self.local.get(key)
+        try:
+            raw = self.shared.get(key)
+        except Exception as e:
+            logger.warning(f"Shared pet owner cache read failed: {e}")
+            return None
+        return uuid.UUID(raw.decode() if isinstance(raw, bytes) else raw) if raw else None
+
+    def set(self, pet_id: uuid.UUID, owner_id: uuid.UUID) -> None:
+        if not self.enabled:
+            return
+        key = self._key(pet_id)
+        if self.shared is None:
+            self.local.set(key, owner_id)
+            return
+        try:
+            self.shared.set(key, str(owner_id), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Shared pet owner cache write failed: {e}")
+
+    def invalidate(self, pet_id: uuid.UUID) -> None:
+        key = self._key(pet_id)
+        self.local.delete(key)
+        if self.shared is None:
+            return
+        try:
+            self.shared.delete(key)
+        except Exception as e:
+            # The entry expires within the TTL
+            logger.warning(f"Shared pet owner cache invalidation failed: {e}")
+
+    # The async routes check ownership on the event loop; only a shared
+    # backend does blocking I/O, so only then hop to a thread
+    async def aget(self, pet_id: uuid.UUID) -> uuid.UUID | None:
+        if self.shared is None:
+            return self.get(pet_id)
+        return await asyncio.to_thread(self.get, pet_id)
+
+    async def aset(self, pet_id: uuid.UUID, owner_id: uuid.UUID) -> None:
+        if self.shared is None:
+            self.set(pet_id, owner_id)
+        else:
+            await asyncio.to_thread(self.set, pet_id, owner_id)
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.local.stats(), "shared": self.shared is not None}
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    shared=get_shared_cache(),
+)
+pet_owner_cache = PetOwnerCache(
+    maxsize=settings.PET_OWNER_CACHE_SIZE,
+    ttl=settings.PET_OWNER_CACHE_TTL_SECONDS,
+    shared=get_shared_cache(),
+)
@@ -0,0 +1,289 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_pinecone import PineconeVectorStore
+from pinecone import Pinecone
+
+from app.core.cache import (
+    LRUCache,
+    SharedCache,
+    get_shared_cache,
+    hash_key,
+    normalize_text,
+)
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Read from dotenv
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+OPENAI_MODEL_NAME = os.getenv("OPENAI_MODEL_NAME", "gpt-4o")
+OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002")
+PINECONE_KEY = os.getenv("PINECONE_KEY", "")
+PINECONE_INDEX = os.getenv("PINECONE_INDEX", "")
+PINECONE_NAMESPACE = os.getenv("PINECONE_NAMESPACE", "")
+
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+VectorStoreFactory = Callable[[Embeddings], VectorStore]
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Caches query embeddings in front of another `Embeddings`.
+
+    Keys combine the model name with the normalised query text, so repeat
+    questions skip the embedding call. Lookups go to the in-process LRU
+    first, then the optional shared tier; document embeddings pass through.
+    A failing shared tier reads as a miss, so the query is embedded instead.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        *,
+        model: str,
+        local: LRUCache[list[float]],
+        shared: SharedCache | None = None,
+    ) -> None:
+        self.embeddings = embeddings
+        self.model = model
+        self.local = local
+        self.shared = shared
+        self.shared_hits = 0
+
+    def _key(self, text: str) -> str:
+        return "emb:" + hash_key(self.model, normalize_text(text))
+
+    def _shared_get(self, key: str) -> list[float] | None:
+        if self.shared is None:
+            return None
+        try:
+            raw = self.shared.get(key)
+        except Exception as e:
+            logger.warning(f"Shared embedding cache read failed: {e}")
+            return None
+        if raw is None:
+            return None
+        self.shared_hits += 1
+        vector: list[float] = json.loads(raw)
+        self.local.set(key, vector)
+        return vector
+
+    def _store(self, key: str, vector: list[float]) -> None:
+        self.local.set(key, vector)
+        if self.shared is not None:
+            ex = int(self.local.ttl) if self.local.ttl else None
+            try:
+                self.shared.set(key, json.dumps(vector), ex=ex)
+            except Exception as e:
+                logger.warning(f"Shared embedding cache write failed: {e}")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+        vector = self.local.get(key) or self._shared_get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self._store(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+        vector = self.local.get(key)
+        if vector is None and self.shared is not None:
+            vector = await asyncio.to_thread(self._shared_get, key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            if self.shared is None:
+                self._store(key, vector)
+            else:
+                await asyncio.to_thread(self._store, key, vector)
+        return vector
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.local.stats(), "shared_hits": self.shared_hits}
+
+
+def cached_openai_embeddings(
+    local: LRUCache[list[float]],
+    http_client: httpx.Client | None = None,
+    http_async_client: httpx.AsyncClient | None = None,
+) -> CachedEmbeddings:
+    return CachedEmbeddings(
+        OpenAIEmbeddings(
+            model=OPENAI_EMBEDDING_MODEL,
+            openai_api_key=OPENAI_API_KEY,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        ),
+        model=OPENAI_EMBEDDING_MODEL,
+        local=local,
+        shared=get_shared_cache(),
+    )
+
+
+def pinecone_vectorstore_factory(embeddings: Embeddings) -> VectorStore:
+    pc = Pinecone(api_key=PINECONE_KEY)
+    return PineconeVectorStore(
+        index=pc.Index(PINECONE_INDEX),
+        embedding=embeddings,
+        namespace=PINECONE_NAMESPACE,
+    )
+
+
+class RAGPipeline:
+    """
+    Process-wide chat model, embeddings and vector store for RAG requests.
+
+    Everything is built once, on first use or at application startup, and
+    shares pooled HTTP clients so requests reuse warm connections instead of
+    paying for client setup and TLS handshakes every time.
+    """
+
+    def __init__(
+        self,
+        *,
+        vectorstore_factory: VectorStoreFactory = pinecone_vectorstore_factory,
+        top_k: int = 4,
+    ) -> None:
+        self._vectorstore_factory = vectorstore_factory
+        self._top_k = top_k
+        self._lock = threading.Lock()
+        self._http_client: httpx.Client | None = None
+        self._http_async_client: httpx.AsyncClient | None = None
+        self._chat: ChatOpenAI | None = None
+        self._retriever: Any = None
+        self._embeddings: CachedEmbeddings | None = None
+        self._closing: set[asyncio.Task[None]] = set()
+        self.embedding_cache: LRUCache[list[float]] = LRUCache(
+            maxsize=settings.EMBEDDING_CACHE_SIZE,
+            ttl=settings.EMBEDDING_CACHE_TTL_SECONDS,
+        )
+        self.builds = 0
+        self.requests = 0
+        self.errors = 0
+        self.retrieval_seconds = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self._retriever is not None
+
+    def _build(self) -> None:
+        http_client = httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+        http_async_client = httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+        try:
+            chat = ChatOpenAI(
+                model=OPENAI_MODEL_NAME,
+                temperature=0.9,
+                max_tokens=1000,
+                api_key=OPENAI_API_KEY,
+                http_client=http_client,
+                http_async_client=http_async_client,
+            )
+            embeddings = cached_openai_embeddings(
+                self.embedding_cache, http_client, http_async_client
+            )
+            vectorstore = self._vectorstore_factory(embeddings)
+        except Exception:
+            http_client.close()
+            self._close_async_client(http_async_client)
+            raise
+        self._http_client = http_client
+        self._http_async_client = http_async_client
+        self._chat = chat
+        self._embeddings = embeddings
+        self._retriever = vectorstore.as_retriever(search_kwargs={"k": self._top_k})
+        self.builds += 1
+
+    def _close_async_client(self, client: httpx.AsyncClient) -> None:
+        # _build is sync but also runs on the event loop (lifespan, first
+        # request), where the close has to be scheduled instead
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(client.aclose())
+            return
+        task = loop.create_task(client.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def start(self) -> None:
+        if self.ready:
+            return
+        with self._lock:
+            if not self.ready:
+                self._build()
+
+    @property
+    def chat(self) -> ChatOpenAI:
+        self.start()
+        assert self._chat is not None
+        return self._chat
+
+    async def retrieve(self, query: str) -> list[Document]:
+        self.start()
+        self.requests += 1
+        started = time.perf_counter()
+        try:
+            documents: list[Document] = await self._retriever.ainvoke(query)
+            return documents
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.retrieval_seconds += time.perf_counter() - started
+
+    def health(self) -> dict[str, Any]:
+        return {"ready": self.ready, "index": PINECONE_INDEX, **self.metrics()}
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "builds": self.builds,
+            "requests": self.requests,
+            "errors": self.errors,
+            "retrieval_seconds": round(self.retrieval_seconds, 3),
+            "embedding_cache": (
+                self._embeddings.stats()
+                if self._embeddings is not None
+                else self.embedding_cache.stats()
+            ),
+        }
+
+    async def aclose(self) -> None:
+        if self._http_async_client is not None:
+            await self._http_async_client.aclose()
+        if self._http_client is not None:
+            self._http_client.close()
+        self._http_client = None
+        self._http_async_client = None
+        self._chat = None
+        self._embeddings = None
+        self._retriever = None
+
+
+rag_pipeline = RAGPipeline()
+
+
+def get_rag_pipeline() -> RAGPipeline:
+    return rag_pipeline
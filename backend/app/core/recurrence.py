@@ -0,0 +1,161 @@
+import calendar
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone, tzinfo
+from typing import Literal
+from zoneinfo import ZoneInfo
+
+from app.model.reminder import Reminder
+
+Unit = Literal["hour", "day", "week", "month"]
+
+NAMED_FREQUENCIES: dict[str, tuple[Unit, int]] = {
+    "hourly": ("hour", 1),
+    "daily": ("day", 1),
+    "weekly": ("week", 1),
+    "biweekly": ("week", 2),
+    "fortnightly": ("week", 2),
+    "monthly": ("month", 1),
+    "yearly": ("month", 12),
+    "annually": ("month", 12),
+}
+# Custom frequencies the app lets users type, e.g. "Every 3 days"
+EVERY_N = re.compile(r"^every\s+(\d+)?\s*(hour|day|week|month|year)s?$")
+
+# Reminder fields that change when it fires
+RULE_FIELDS = frozenset(
+    {
+        "frequency",
+        "start_date",
+        "reminder_date",
+        "reminder_time",
+        "end_date",
+        "end_frequency_date",
+        "is_active",
+        "timezone",
+    }
+)
+
+FIXED_STEPS: dict[Unit, timedelta] = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+
+
+def parse_frequency(frequency: str | None) -> tuple[Unit, int] | None:
+    """
+    Normalise a reminder's free-form frequency to (unit, interval).
+
+    None means the reminder doesn't repeat: "Never", and anything that isn't
+    recognised, which is then treated as a one-off rather than rejected.
+    """
+    text = " ".join((frequency or "").lower().split())
+    if text in NAMED_FREQUENCIES:
+        return NAMED_FREQUENCIES[text]
+    match = EVERY_N.match(text)
+    if not match:
+        return None
+    interval = int(match.group(1) or 1)
+    if interval < 1:
+        return None
+    unit = match.group(2)
+    if unit == "year":
+        return "month", 12 * interval
+    return unit, interval  # type: ignore[return-value]
+
+
+def _to_utc(at: datetime, tz: tzinfo) -> datetime:
+    return at.replace(tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _add_months(first: datetime, months: int) -> datetime:
+    # Keep the first occurrence's day of month, clamped to short months
+    year, month = divmod(first.month - 1 + months, 12)
+    year += first.year
+    day = min(first.day, calendar.monthrange(year, month + 1)[1])
+    return first.replace(year=year, month=month + 1, day=day)
+
+
+# A zone's offset changes by less than this, so widening a UTC window by it
+# covers the same span of wall-clock time
+MAX_OFFSET = timedelta(days=1)
+
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    # Wall-clock times in `tz`, which occurrences keep across DST changes
+    first: datetime
+    unit: Unit | None = None
+    interval: int = 1
+    # Inclusive; no occurrence falls after it
+    until: datetime | None = None
+    tz: tzinfo = timezone.utc
+
+    def _nth(self, n: int) -> datetime:
+        if self.unit is None:
+            return self.first
+        if self.unit == "month":
+            return _add_months(self.first, n * self.interval)
+        return self.first + n * self.interval * FIXED_STEPS[self.unit]
+
+    def _first_index_from(self, start: datetime) -> int:
+        if self.unit is None or start <= self.first:
+            return 0
+        if self.unit == "month":
+            months = (start.year - self.first.year) * 12 + start.month - self.first.month
+            # One early, since clamping can pull an occurrence back a few days
+            return max(0, months // self.interval - 1)
+        step = self.interval * FIXED_STEPS[self.unit]
+        return -(-(start - self.first) // step)
+
+    def between(self, start: datetime, end: datetime) -> Iterator[datetime]:
+        """
+        Occurrences in [start, end) as naive UTC, found without walking the
+        ones before `start`. `start` and `end` are naive UTC too.
+        """
+        n = self._first_index_from(start - MAX_OFFSET)
+        while True:
+            at = self._nth(n)
+            if at >= end + MAX_OFFSET or (self.until is not None and at > self.until):
+                return
+            fire_at = _to_utc(at, self.tz)
+            if start <= fire_at < end:
+                yield fire_at
+            if self.unit is None:
+                return
+            n += 1
+
+
+def rule_for(reminder: Reminder) -> RecurrenceRule | None:
+    """
+    The schedule a reminder describes, or None for an inactive one.
+
+    It first fires on start_date (or reminder_date, or the day it was
+    created) at reminder_time, and repeats until the earlier of
+    end_frequency_date and end_date. The dates and time are wall-clock in
+    the reminder's timezone, so a daily 08:00 reminder stays at 08:00 local
+    time across DST changes; hourly ones step in real time instead.
+    """
+    if not reminder.is_active:
+        return None
+    tz: tzinfo = ZoneInfo(reminder.timezone)
+    created_on = reminder.created_at.replace(tzinfo=timezone.utc).astimezone(tz).date()
+    first_day = reminder.start_date or reminder.reminder_date or created_on
+    last_days = [d for d in (reminder.end_frequency_date, reminder.end_date) if d]
+    parsed = parse_frequency(reminder.frequency)
+    unit, interval = parsed if parsed else (None, 1)
+    first = datetime.combine(first_day, reminder.reminder_time)
+    until = datetime.combine(min(last_days), time.max) if last_days else None
+    if unit == "hour":
+        first = _to_utc(first, tz)
+        until = _to_utc(until, tz) if until else None
+        tz = timezone.utc
+    return RecurrenceRule(first=first, unit=unit, interval=interval, until=until, tz=tz)
+
+
+def occurrences(reminder: Reminder, start: datetime, end: datetime) -> list[datetime]:
+    rule = rule_for(reminder)
+    return list(rule.between(start, end)) if rule else []
+
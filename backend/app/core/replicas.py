@@ -0,0 +1,275 @@
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.cache import LRUCache, SharedCache, get_shared_cache
+from app.core.config import settings
+from app.core.db_pool import PoolStats, engine_options, track_in_use
+
+logger = logging.getLogger(__name__)
+
+# Zero when the replica has replayed everything it received, so an idle
+# primary doesn't read as a lagging replica. NULL when its WAL receiver isn't
+# streaming: replay has caught up with a receive position that no longer
+# moves, so the replica is cut off, not fresh. Without pg_read_all_stats the
+# receiver's status reads as NULL and only its existence is checked.
+PG_REPLICA_LAG = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver
+            WHERE COALESCE(status, 'streaming') = 'streaming'
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: Engine
+    async_engine: AsyncEngine | None = None
+    pool_stats: PoolStats = field(default_factory=PoolStats)
+    async_pool_stats: PoolStats = field(default_factory=PoolStats)
+    # None until the first successful check, and while unreachable or not
+    # streaming
+    lag: float | None = None
+    checked_at: float = 0.0
+    reads: int = 0
+
+    def measure_lag(self) -> float | None:
+        with self.engine.connect() as conn:
+            if self.engine.dialect.name != "postgresql":
+                # SQLite stand-ins and the like only get a reachability check
+                conn.execute(text("SELECT 1"))
+                return 0.0
+            lag = conn.execute(PG_REPLICA_LAG).scalar_one()
+            return None if lag is None else float(lag)
+
+    def as_dict(self) -> dict[str, Any]:
+        stats: dict[str, Any] = {
+            "lag_seconds": self.lag,
+            "checked_at": self.checked_at,
+            "reads": self.reads,
+            "pool": {"status": self.engine.pool.status(), **self.pool_stats.as_dict()},
+        }
+        if self.async_engine is not None:
+            stats["async_pool"] = {
+                "status": self.async_engine.pool.status(),
+                **self.async_pool_stats.as_dict(),
+            }
+        return stats
+
+
+def create_replica(url: str, *, with_async: bool) -> Replica:
+    pool_stats = PoolStats()
+    replica = Replica(
+        name=make_url(url).render_as_string(hide_password=True),
+        engine=create_engine(url, **engine_options(QueuePool, pool_stats)),
+        pool_stats=pool_stats,
+    )
+    track_in_use(replica.engine, pool_stats)
+    if with_async:
+        replica.async_engine = create_async_engine(
+            url, **engine_options(AsyncAdaptedQueuePool, replica.async_pool_stats)
+        )
+        track_in_use(replica.async_engine.sync_engine, replica.async_pool_stats)
+    return replica
+
+
+class ReplicaRouter:
+    """
+    Picks the database a read-only request should use.
+
+    Replicas take turns as long as their last measured lag is within
+    `max_lag`; when none qualifies the read falls back to the primary. A user
+    who just committed a write reads from the primary for `sticky_seconds`
+    so they see their own change. The mark lives in the shared cache when
+    one is configured, so it holds whichever worker serves the next request.
+    """
+
+    def __init__(
+        self,
+        replicas: list[Replica],
+        *,
+        max_lag: float,
+        sticky_seconds: int,
+        shared: SharedCache | None = None,
+    ) -> None:
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.shared = shared
+        self.recent_writers: LRUCache[bool] = LRUCache(maxsize=10_000, ttl=sticky_seconds)
+        self._turn = itertools.count()
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def _key(user_id: uuid.UUID) -> str:
+        return f"wrote:{user_id}"
+
+    def _share_write(self, key: str) -> None:
+        assert self.shared is not None
+        try:
+            self.shared.set(key, "1", ex=self.sticky_seconds)
+        except Exception as e:
+            logger.warning(f"Couldn't share the read-your-writes mark: {e}")
+
+    def mark_write(self, user_id: uuid.UUID) -> None:
+        if not self.replicas:
+            return
+        key = self._key(user_id)
+        self.recent_writers.set(key, True)
+        if self.shared is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # A sync session committing in a threadpool worker
+            self._share_write(key)
+        else:
+            # An AsyncSession committing on the event loop
+            loop.run_in_executor(None, self._share_write, key)
+
+    def _wrote_recently_shared(self, key: str) -> bool:
+        assert self.shared is not None
+        try:
+            return self.shared.get(key) is not None
+        except Exception as e:
+            # Can't tell, so read from the primary, which is never stale
+            logger.warning(f"Couldn't check the read-your-writes mark: {e}")
+            return True
+
+    def _choose(self, sticky: bool) -> Replica | None:
+        if sticky:
+            self.sticky_reads += 1
+            return None
+        healthy = [
+            replica
+            for replica in self.replicas
+            if replica.lag is not None and replica.lag <= self.max_lag
+        ]
+        if not healthy:
+            self.fallbacks += 1
+            return None
+        replica = healthy[next(self._turn) % len(healthy)]
+        replica.reads += 1
+        return replica
+
+    def pick(self, user_id: uuid.UUID | None) -> Replica | None:
+        """
+        The replica to read from, or None for the primary.
+        """
+        if not self.replicas:
+            self.primary_reads += 1
+            return None
+        sticky = False
+        if user_id is not None:
+            key = self._key(user_id)
+            sticky = bool(self.recent_writers.get(key)) or (
+                self.shared is not None and self._wrote_recently_shared(key)
+            )
+        return self._choose(sticky)
+
+    async def apick(self, user_id: uuid.UUID | None) -> Replica | None:
+        """
+        `pick` for the event loop: the shared cache lookup, when needed,
+        runs in a thread.
+        """
+        if not self.replicas:
+            self.primary_reads += 1
+            return None
+        sticky = False
+        if user_id is not None:
+            key = self._key(user_id)
+            sticky = bool(self.recent_writers.get(key))
+            if not sticky and self.shared is not None:
+                sticky = await asyncio.to_thread(self._wrote_recently_shared, key)
+        return self._choose(sticky)
+
+    def check_lag(self) -> None:
+        for replica in self.replicas:
+            try:
+                replica.lag = replica.measure_lag()
+            except Exception as e:
+                replica.lag = None
+                logger.warning(f"Replica {replica.name} is unreachable: {e}")
+            else:
+                if replica.lag is None:
+                    logger.warning(f"Replica {replica.name} is not streaming from the primary")
+                elif replica.lag > self.max_lag:
+                    logger.warning(f"Replica {replica.name} is {replica.lag:.1f}s behind")
+            replica.checked_at = time.time()
+
+    async def monitor(self, interval: float) -> None:
+        while True:
+            await asyncio.to_thread(self.check_lag)
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose()
+            if replica.async_engine is not None:
+                await replica.async_engine.dispose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "fallbacks": self.fallbacks,
+            "replicas": {replica.name: replica.as_dict() for replica in self.replicas},
+        }
+
+
+replica_router = ReplicaRouter(
+    [
+        create_replica(url, with_async=settings.ASYNC_DB_ENABLED)
+        for url in settings.REPLICA_DATABASE_URIS
+    ],
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+    shared=get_shared_cache(),
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_write(session: Session, _flush_context: Any) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_bulk_write(orm_execute_state: ORMExecuteState) -> None:
+    # insert()/update()/delete() statements bypass the flush
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+
+@event.listens_for(Session, "after_commit")
+def _stick_writer_to_primary(session: Session) -> None:
+    # Sessions opened by the request dependencies carry the request's state,
+    # where get_current_principal leaves the user id
+    if session.info.pop("wrote", False):
+        user_id = getattr(session.info.get("request_state"), "principal_id", None)
+        if user_id is not None:
+            replica_router.mark_write(user_id)
@@ -1,11 +1,26 @@
 import uuid
-from typing import Any
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timedelta
+from typing import Any, TypeVar
 
-from sqlmodel import Session, select
+from sqlalchemy import delete, or_, update
+from sqlalchemy import select as select_columns
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, SQLModel, col, select
 
+from app.core.notifications import DueReminder, Notifier
+from app.core.recurrence import occurrences
 from app.core.security import get_password_hash, verify_password
+from app.model.barcode_product import BarcodeProduct, BarcodeProductCreate
 from app.model.pet import Pet, PetCreate
-from app.model.user import UserCreate, UserUpdate, User
+from app.model.reminder import Reminder
+from app.model.reminder_occurrence import ReminderOccurrence
+from app.model.timestamps import utcnow
+from app.model.user import User, UserCreate, UserUpdate
+
+ModelT = TypeVar("ModelT", bound=SQLModel)
+
+OCCURRENCE_INSERT_CHUNK = 5_000
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
@@ -54,3 +69,317 @@ def create_pet(*, session: Session, pet_in: PetCreate, user_id: uuid.UUID) -> Pe
     session.refresh(db_pet)
     return db_pet
 
+
+def save(*, session: Session, db_obj: ModelT) -> ModelT:
+    """
+    Add `db_obj` and commit without the SELECT that session.refresh() costs.
+
+    The object isn't expired by this commit, so it keeps the values it was
+    written with. Columns the database sets itself come back through
+    INSERT/UPDATE ... RETURNING on models mapped with eager_defaults.
+    """
+    session.add(db_obj)
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = expire_on_commit
+    return db_obj
+
+
+def create_many(*, session: Session, db_objs: list[ModelT]) -> list[ModelT]:
+    """
+    Insert rows of one table with a single multi-row INSERT ... RETURNING and
+    commit once. The returned objects are detached, so reading them after the
+    commit doesn't reload each row.
+    """
+    if not db_objs:
+        return []
+    model = type(db_objs[0])
+    statement = insert(model).values([db_obj.model_dump() for db_obj in db_objs])
+    created = list(session.scalars(statement.returning(model)))
+    for db_obj in created:
+        session.expunge(db_obj)
+    session.commit()
+    return created
+
+
+def upsert(
+    *,
+    session: Session,
+    db_obj: ModelT,
+    conflict_on: Sequence[str],
+    update: Iterable[str],
+) -> ModelT:
+    """
+    Insert `db_obj`, or if a row with the same `conflict_on` columns exists
+    update just the `update` columns of it (and updated_at), as one
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING, and commit. Needs a
+    unique constraint on `conflict_on`.
+    """
+    model = type(db_obj)
+    statement = insert(model).values(db_obj.model_dump())
+    set_: dict[str, Any] = {name: statement.excluded[name] for name in update}
+    if "updated_at" in model.__table__.c:  # type: ignore[attr-defined]
+        set_["updated_at"] = utcnow()
+    if not set_:
+        # DO NOTHING wouldn't return the existing row
+        set_ = {conflict_on[0]: statement.excluded[conflict_on[0]]}
+    statement = statement.on_conflict_do_update(index_elements=conflict_on, set_=set_)
+    saved = session.scalars(
+        statement.returning(model).execution_options(populate_existing=True)
+    ).one()
+    session.expunge(saved)
+    session.commit()
+    return saved
+
+
+def schedule_reminders(
+    *,
+    session: Session,
+    reminders: Sequence[Reminder],
+    start: datetime,
+    until: datetime,
+    replace: bool = False,
+) -> None:
+    """
+    Materialise the occurrences of `reminders` from `start` (or where each
+    reminder's schedule ended, if later) up to `until`. With `replace`, for
+    reminders whose rule changed, occurrences from `start` on are dropped
+    first. Doesn't commit or move occurrences_until; callers do.
+    """
+    if not reminders:
+        return
+    # Nothing is materialised yet for reminders this flush inserts, even if
+    # their occurrences_until is already set to where they'll be scheduled
+    new = {reminder.id for reminder in reminders if reminder in session.new}
+    session.flush()
+    if replace:
+        session.exec(  # type: ignore
+            delete(ReminderOccurrence).where(
+                col(ReminderOccurrence.reminder_id).in_([r.id for r in reminders]),
+                col(ReminderOccurrence.fire_at) >= start,
+                # Already sent ones stay, so re-inserting them is a no-op
+                col(ReminderOccurrence.dispatched_at).is_(None),
+            )
+        )
+    rows: list[dict[str, Any]] = []
+    for reminder in reminders:
+        begin = start
+        if not replace and reminder.id not in new and reminder.occurrences_until:
+            begin = max(start, reminder.occurrences_until)
+        rows.extend(
+            {
+                "id": uuid.uuid4(),
+                "reminder_id": reminder.id,
+                "pet_id": reminder.pet_id,
+                "fire_at": fire_at,
+            }
+            for fire_at in occurrences(reminder, begin, until)
+        )
+    # Keep each INSERT well under Postgres' 65535 bind parameter limit
+    for offset in range(0, len(rows), OCCURRENCE_INSERT_CHUNK):
+        statement = insert(ReminderOccurrence).values(
+            rows[offset : offset + OCCURRENCE_INSERT_CHUNK]
+        )
+        session.exec(  # type: ignore
+            statement.on_conflict_do_nothing(index_elements=["reminder_id", "fire_at"])
+        )
+
+
+def extend_reminder_schedules(
+    *, session: Session, now: datetime, horizon: timedelta, batch_size: int = 500
+) -> int:
+    """
+    Extend the occurrences of active reminders to `now + horizon`, a
+    committed batch at a time. A reminder is only picked up once less than
+    half the horizon is left, so each run touches a small share of them.
+    Rows are claimed with SKIP LOCKED so several workers can run this at
+    once. Returns how many reminders were extended.
+    """
+    until = now + horizon
+    due = now + horizon / 2
+    extended = 0
+    while True:
+        reminders = session.exec(
+            select(Reminder)
+            .where(
+                col(Reminder.is_active).is_(True),
+                or_(
+                    col(Reminder.occurrences_until).is_(None),
+                    col(Reminder.occurrences_until) < due,
+                ),
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not reminders:
+            return extended
+        schedule_reminders(session=session, reminders=reminders, start=now, until=until)
+        session.exec(  # type: ignore
+            update(Reminder)
+            .where(col(Reminder.id).in_([r.id for r in reminders]))
+            # Keep updated_at, which tracks edits, not schedule upkeep
+            .values(occurrences_until=until, updated_at=Reminder.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        extended += len(reminders)
+
+
+def dispatch_due_reminders(
+    *,
+    session: Session,
+    notifier: Notifier,
+    now: datetime,
+    lookahead: timedelta,
+    max_lateness: timedelta,
+    batch_size: int = 500,
+) -> int:
+    """
+    Claim up to `batch_size` undispatched occurrences firing before
+    `now + lookahead`, pass the ones still worth sending to `notifier` and
+    mark them all dispatched. Rows are claimed with SKIP LOCKED so several
+    dispatchers can run at once. Occurrences of users who turned
+    notifications off, or older than `max_lateness`, are marked without
+    being sent. Returns how many occurrences were claimed.
+    """
+    # SQLAlchemy's select(): sqlmodel's is only typed for a few columns, and
+    # its Session.exec() in turn isn't typed for SQLAlchemy's Select
+    statement = (
+        select_columns(
+            col(ReminderOccurrence.id),
+            col(ReminderOccurrence.fire_at),
+            col(Reminder.id),
+            col(Reminder.pet_id),
+            col(Reminder.category),
+            col(Reminder.title),
+            col(Reminder.notes),
+            col(Reminder.dosage),
+            col(Reminder.timezone),
+            col(Reminder.is_active),
+            col(Pet.name),
+            col(User.id),
+            col(User.email),
+            col(User.is_active),
+            col(User.notification),
+        )
+        .join(Reminder, col(Reminder.id) == ReminderOccurrence.reminder_id)
+        .join(Pet, col(Pet.id) == Reminder.pet_id)
+        .join(User, col(User.id) == Pet.user_id)
+        .where(
+            col(ReminderOccurrence.dispatched_at).is_(None),
+            col(ReminderOccurrence.fire_at) < now + lookahead,
+        )
+        .order_by(col(ReminderOccurrence.fire_at))
+        .limit(batch_size)
+        .with_for_update(of=ReminderOccurrence, skip_locked=True)
+    )
+    rows = session.exec(statement).all()  # type: ignore[call-overload]
+    if not rows:
+        return 0
+    due = [
+        DueReminder(
+            occurrence_id=occurrence_id,
+            reminder_id=reminder_id,
+            pet_id=pet_id,
+            user_id=user_id,
+            email=email,
+            pet_name=pet_name,
+            category=category,
+            title=title,
+            notes=notes,
+            dosage=dosage,
+            fire_at=fire_at,
+            timezone=timezone,
+        )
+        for (
+            occurrence_id,
+            fire_at,
+            reminder_id,
+            pet_id,
+            category,
+            title,
+            notes,
+            dosage,
+            timezone,
+            reminder_active,
+            pet_name,
+            user_id,
+            email,
+            user_active,
+            notification,
+        ) in rows
+        if reminder_active
+        and user_active
+        and notification
+        and fire_at >= now - max_lateness
+    ]
+    if due:
+        notifier.send(due)
+    session.exec(  # type: ignore
+        update(ReminderOccurrence)
+        .where(col(ReminderOccurrence.id).in_([row[0] for row in rows]))
+        .values(dispatched_at=utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return len(rows)
+
+
+def prune_dispatched_occurrences(*, session: Session, before: datetime) -> int:
+    result = session.exec(  # type: ignore
+        delete(ReminderOccurrence).where(
+            col(ReminderOccurrence.dispatched_at).is_not(None),
+            col(ReminderOccurrence.fire_at) < before,
+        )
+    )
+    session.commit()
+    return int(result.rowcount)
+
+
+def get_barcode_product(
+    *, session: Session, barcode_data: str, barcode_type: str
+) -> BarcodeProduct | None:
+    statement = select(BarcodeProduct).where(
+        BarcodeProduct.barcode_data == barcode_data,
+        BarcodeProduct.barcode_type == barcode_type,
+    )
+    return session.exec(statement).first()
+
+
+def save_barcode_products(
+    *,
+    session: Session,
+    products_in: list[BarcodeProductCreate],
+    version: int,
+    expires_at: datetime | None,
+) -> None:
+    if not products_in:
+        return
+    now = datetime.utcnow()
+    # One row per barcode: ON CONFLICT can't touch the same row twice
+    rows = {
+        (product_in.barcode_data, product_in.barcode_type): {
+            "id": uuid.uuid4(),
+            **product_in.model_dump(),
+            "version": version,
+            "expires_at": expires_at,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for product_in in products_in
+    }
+    statement = insert(BarcodeProduct).values(list(rows.values()))
+    statement = statement.on_conflict_do_update(
+        constraint="uq_barcode_product_barcode",
+        set_={
+            "product_data": statement.excluded.product_data,
+            "version": statement.excluded.version,
+            "expires_at": statement.excluded.expires_at,
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+    session.exec(statement)  # type: ignore
+    session.commit()
@@ -1,11 +1,27 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
 from starlette.middleware.cors import CORSMiddleware
-from starlette.staticfiles import StaticFiles
 
+from app import crud
 from app.api.main import api_router
+from app.core.avatars import UploadStaticFiles, shutdown_avatar_executor
+from app.core.barcodes import barcode_decoder
 from app.core.config import settings
+from app.core.db import async_engine, engine
+from app.core.rag import rag_pipeline
+from app.core.replicas import replica_router
+
+logger = logging.getLogger(__name__)
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -15,13 +31,61 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+def extend_reminder_schedules() -> None:
+    with Session(engine) as session:
+        crud.extend_reminder_schedules(
+            session=session,
+            now=datetime.utcnow(),
+            horizon=timedelta(days=settings.REMINDER_HORIZON_DAYS),
+        )
+
+
+async def keep_reminder_horizon(interval: float) -> None:
+    # Every worker runs this; SKIP LOCKED splits the batches between them
+    while True:
+        try:
+            await asyncio.to_thread(extend_reminder_schedules)
+        except Exception as e:
+            logger.warning(f"Extending reminder schedules failed: {e}")
+        await asyncio.sleep(interval)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    try:
+        rag_pipeline.start()
+    except Exception as e:
+        # Not fatal: the pipeline is built lazily on the first RAG request
+        logger.warning(f"RAG pipeline warm-up failed: {e}")
+    replica_monitor = None
+    if replica_router.replicas:
+        replica_monitor = asyncio.create_task(
+            replica_router.monitor(settings.REPLICA_LAG_CHECK_SECONDS)
+        )
+    reminder_horizon = asyncio.create_task(
+        keep_reminder_horizon(settings.REMINDER_HORIZON_REFRESH_SECONDS)
+    )
+    yield
+    reminder_horizon.cancel()
+    if replica_monitor is not None:
+        replica_monitor.cancel()
+    await replica_router.dispose()
+    await rag_pipeline.aclose()
+    barcode_decoder.shutdown()
+    shutdown_avatar_executor()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
 )
 
-app.mount("/upload", StaticFiles(directory="/var/lib/dongopet/backend/backend/upload"), name="upload")
+app.mount("/upload", UploadStaticFiles(directory="/var/lib/dongopet/backend/backend/upload"), name="upload")
 
 # Set all CORS enabled origins
 if settings.all_cors_origins:
@@ -33,4 +97,18 @@ if settings.all_cors_origins:
         allow_headers=["*"],
     )
 
+
+@app.exception_handler(IntegrityError)
+async def missing_pet_handler(_request: Request, exc: IntegrityError) -> JSONResponse:
+    # A pet deleted after its ownership check passed (say, from a stale cache
+    # entry) makes the write fail its pet_id foreign key
+    diag = getattr(exc.orig, "diag", None)
+    constraint = getattr(diag, "constraint_name", None) or ""
+    if getattr(exc.orig, "sqlstate", None) == "23503" and constraint.endswith("pet_id_fkey"):
+        return JSONResponse(status_code=404, content={"detail": "Pet not found"})
+    # Anything else is the unhandled error it would have been without this
+    logger.error("Unhandled integrity error", exc_info=exc)
+    return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
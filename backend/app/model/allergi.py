@@ -1,5 +1,6 @@
 import uuid
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 from app.model.pet import Pet
 
@@ -18,6 +19,9 @@ class AllergiUpdate(AllergiBase):
 
 class Allergi(AllergiBase, table=True):
     __tablename__ = "allergi"
+    __table_args__ = (
+        Index("ix_allergi_pet_id_created_at", "pet_id", "created_at"),
+    )
     
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     pet_id: uuid.UUID = Field(
@@ -0,0 +1,30 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, Column, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class BarcodeProductBase(SQLModel):
+    barcode_data: str = Field(max_length=255)
+    barcode_type: str = Field(max_length=50)
+    product_data: dict[str, Any] = Field(sa_column=Column(JSON, nullable=False))
+
+
+class BarcodeProductCreate(BarcodeProductBase):
+    pass
+
+
+# Product details generated for a scanned barcode, reused by later scans
+class BarcodeProduct(BarcodeProductBase, table=True):
+    __tablename__ = "barcode_product"
+    __table_args__ = (
+        UniqueConstraint("barcode_data", "barcode_type", name="uq_barcode_product_barcode"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    version: int = Field(default=1)
+    expires_at: datetime | None = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
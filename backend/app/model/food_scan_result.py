@@ -1,5 +1,6 @@
 import uuid
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 from app.model.pet import Pet
 
@@ -38,6 +39,9 @@ class FoodScanResultUpdate(FoodScanResultBase):
 
 class FoodScanResult(FoodScanResultBase, table=True):
     __tablename__ = "food_scan_result"
+    __table_args__ = (
+        Index("ix_food_scan_result_pet_id_created_at", "pet_id", "created_at"),
+    )
     
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     pet_id: uuid.UUID = Field(
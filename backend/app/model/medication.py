@@ -1,7 +1,9 @@
 import uuid
 from datetime import datetime
+from sqlalchemy import UniqueConstraint
 from sqlmodel import Field, Relationship, SQLModel
 from app.model.pet import Pet
+from app.model.timestamps import updated_at_field
 
 
 class MedicationBase(SQLModel):
@@ -22,13 +24,16 @@ class MedicationUpdate(MedicationBase):
 
 class Medication(MedicationBase, table=True):
     __tablename__ = "medication"
+    # One per pet; the PATCH routes upsert on it
+    __table_args__ = (UniqueConstraint("pet_id", name="uq_medication_pet_id"),)
+    __mapper_args__ = {"eager_defaults": True}
     
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     pet_id: uuid.UUID = Field(
         foreign_key="pet.id", nullable=False, ondelete="CASCADE"
     )
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = updated_at_field()
     pet: Pet | None = Relationship(back_populates="medications")
 
 
@@ -1,4 +1,7 @@
 import uuid
+from datetime import datetime
+from pydantic import computed_field
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 from app.model.user import User
 from typing import TYPE_CHECKING
@@ -51,11 +54,16 @@ class PetUpdate(PetBase):
 # Database model, database table inferred from class name
 class Pet(PetBase, table=True):
     __tablename__ = "pet"
+    __table_args__ = (
+        Index("ix_pet_user_id_id", "user_id", "id"),
+        Index("ix_pet_user_id_created_at", "user_id", "created_at"),
+    )
     
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
+    created_at: datetime = Field(default_factory=datetime.utcnow)
     owner: User | None = Relationship(back_populates="pets")
     insurance: list["Insurance"] = Relationship(back_populates="pet")
     medical_conditions: list["MedicalCondition"] = Relationship(back_populates="pet")
@@ -71,7 +79,17 @@ class PetPublic(PetBase):
     id: uuid.UUID
     user_id: uuid.UUID
 
+    # Small rendition for list screens; avatars uploaded before renditions
+    # existed fall back to the original image
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def avatar_thumbnail(self) -> str | None:
+        if self.avatar and "/full." in self.avatar:
+            return self.avatar.replace("/full.", "/thumbnail.")
+        return self.avatar
+
 
 class PetsPublic(SQLModel):
     data: list[PetPublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
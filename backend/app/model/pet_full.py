@@ -0,0 +1,19 @@
+from app.model.allergi import AllergiPublic
+from app.model.food_scan_result import FoodScanResultPublic
+from app.model.insurance import InsurancePublic
+from app.model.medical_condition import MedicalConditionPublic
+from app.model.medication import MedicationPublic
+from app.model.pet import PetPublic
+from app.model.reminder import ReminderPublic
+from app.model.vaccination import VaccinationPublic
+
+
+# Everything the pet detail screen shows, returned by one request
+class PetFullPublic(PetPublic):
+    insurance: InsurancePublic | None = None
+    medical_condition: MedicalConditionPublic | None = None
+    medication: MedicationPublic | None = None
+    allergies: list[AllergiPublic] = []
+    vaccinations: list[VaccinationPublic] = []
+    food_scan_results: list[FoodScanResultPublic] = []
+    upcoming_reminders: list[ReminderPublic] = []
@@ -1,11 +1,30 @@
 import uuid
 from datetime import datetime, date, time
-from typing import Optional
+from typing import Annotated, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from pydantic import AfterValidator
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.model.pet import Pet
+from app.model.timestamps import updated_at_field
+
+
+def _check_timezone(name: str) -> str:
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone: {name}")
+    return name
+
+
+# An IANA time zone name, e.g. "Europe/Paris"
+TimeZoneName = Annotated[str, AfterValidator(_check_timezone)]
 
 
+# The dates and reminder_time are wall-clock in `timezone`; the occurrences
+# materialised from them (ReminderOccurrence.fire_at) are naive UTC
 class ReminderBase(SQLModel):
     category: str = Field(max_length=50)  # 'Food', 'Walk', 'Medication', 'Grooming', 'Vet appointment', 'Other'
     title: Optional[str] = Field(default=None, max_length=255)
@@ -17,16 +36,23 @@ class ReminderBase(SQLModel):
     dosage: Optional[str] = Field(default=None, max_length=100)  # Only for medication
     frequency: str = Field(max_length=100)  # 'Never', 'Hourly', 'Daily', 'Weekly', 'Monthly', or custom
     end_frequency_date: Optional[date] = Field(default=None)  # When to stop recurring
+    timezone: TimeZoneName = Field(default="UTC", max_length=64)
     is_active: bool = Field(default=True)
 
 
 class Reminder(ReminderBase, table=True):
     __tablename__ = "reminders"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index("ix_reminders_pet_id_created_at", "pet_id", "created_at"),
+    )
     
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     pet_id: uuid.UUID = Field(foreign_key="pet.id", nullable=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = updated_at_field()
+    # How far ahead reminder_occurrence rows exist; NULL until first expanded
+    occurrences_until: Optional[datetime] = Field(default=None, index=True)
     
     # Relationships
     pet: Optional[Pet] = Relationship(back_populates="reminders")
@@ -47,6 +73,7 @@ class ReminderUpdate(SQLModel):
     dosage: Optional[str] = None
     frequency: Optional[str] = None
     end_frequency_date: Optional[date] = None
+    timezone: Optional[TimeZoneName] = None
     is_active: Optional[bool] = None
 
 
@@ -59,6 +86,7 @@ class ReminderPublic(ReminderBase):
 
 class RemindersPublic(SQLModel):
     data: list[ReminderPublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
 
 
@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Index, UniqueConstraint, text
+from sqlmodel import Field, SQLModel
+
+from app.model.reminder import ReminderPublic
+
+
+# One row per time a reminder fires, materialised a rolling horizon ahead
+class ReminderOccurrence(SQLModel, table=True):
+    __tablename__ = "reminder_occurrence"
+    __table_args__ = (
+        UniqueConstraint("reminder_id", "fire_at", name="uq_reminder_occurrence_reminder_id_fire_at"),
+        Index("ix_reminder_occurrence_pet_id_fire_at", "pet_id", "fire_at"),
+        # What the dispatcher polls; sent rows drop out, so it stays small
+        Index(
+            "ix_reminder_occurrence_due",
+            "fire_at",
+            postgresql_where=text("dispatched_at IS NULL"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    reminder_id: uuid.UUID = Field(
+        foreign_key="reminders.id", nullable=False, ondelete="CASCADE"
+    )
+    pet_id: uuid.UUID = Field(foreign_key="pet.id", nullable=False, ondelete="CASCADE")
+    fire_at: datetime
+    # Set once the dispatcher has handed it to the notifier (or skipped it)
+    dispatched_at: datetime | None = Field(default=None)
+
+
+class ReminderOccurrencePublic(SQLModel):
+    fire_at: datetime
+    reminder: ReminderPublic
+
+
+class ReminderOccurrencesPublic(SQLModel):
+    data: list[ReminderOccurrencePublic]
+    count: int
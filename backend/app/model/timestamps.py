@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlmodel import Field
+
+
+class utcnow(FunctionElement[datetime]):
+    """
+    The database's current time as naive UTC, matching datetime.utcnow().
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow, "postgresql")
+def _pg_utcnow(_element: utcnow, _compiler: Any, **_kw: Any) -> str:
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow)
+def _default_utcnow(_element: utcnow, _compiler: Any, **_kw: Any) -> str:
+    return "CURRENT_TIMESTAMP"
+
+
+def updated_at_field() -> Any:
+    # Set by the database on every UPDATE; mappers with eager_defaults read
+    # it back through RETURNING instead of expiring it
+    return Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": utcnow()})
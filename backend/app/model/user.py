@@ -3,11 +3,14 @@ from datetime import datetime
 from email.policy import default
 
 from pydantic import EmailStr
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 from typing_extensions import Optional, List
 
 
 class User(SQLModel, table=True):
+    __table_args__ = (Index("ix_user_created_at_id", "created_at", "id"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
     name: str = Field(max_length=255)
     full_name: str | None = Field(default=None, max_length=255)
@@ -73,7 +76,8 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: List[UserPublic]
-    count: int
+    count: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class UpdatePassword(SQLModel):
     current_password: str
@@ -1,5 +1,6 @@
 import uuid
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 from app.model.pet import Pet
 
@@ -19,6 +20,9 @@ class VaccinationUpdate(VaccinationBase):
 
 class Vaccination(VaccinationBase, table=True):
     __tablename__ = "vaccination"
+    __table_args__ = (
+        Index("ix_vaccination_pet_id_created_at", "pet_id", "created_at"),
+    )
     
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     pet_id: uuid.UUID = Field(
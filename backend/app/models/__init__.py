@@ -10,8 +10,10 @@ from app.model.vaccination import Vaccination
 from app.model.allergi import Allergi
 from app.model.food_scan_result import FoodScanResult
 from app.model.reminder import Reminder
+from app.model.reminder_occurrence import ReminderOccurrence
+from app.model.barcode_product import BarcodeProduct
 
-__all__ = ["User", "Pet", "Insurance", "MedicalCondition", "Medication", "Vaccination", "Allergi", "FoodScanResult", "Reminder"]
+__all__ = ["User", "Pet", "Insurance", "MedicalCondition", "Medication", "Vaccination", "Allergi", "FoodScanResult", "Reminder", "BarcodeProduct"]
 
 class ChatRequest(BaseModel):
     message: str
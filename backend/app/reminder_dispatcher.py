@@ -0,0 +1,82 @@
+import logging
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+from types import FrameType
+
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.core.notifications import Notifier, get_notifier
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# How often dispatched occurrences past their retention are cleaned up
+prune_interval = 60 * 60
+
+stopping = threading.Event()
+
+
+def dispatch(notifier: Notifier) -> int:
+    """
+    Drain everything currently due, a batch per transaction. Returns how
+    many occurrences were claimed.
+    """
+    claimed = 0
+    with Session(engine) as session:
+        while not stopping.is_set():
+            count = crud.dispatch_due_reminders(
+                session=session,
+                notifier=notifier,
+                now=datetime.utcnow(),
+                lookahead=timedelta(seconds=settings.REMINDER_DISPATCH_LOOKAHEAD_SECONDS),
+                max_lateness=timedelta(
+                    seconds=settings.REMINDER_DISPATCH_MAX_LATENESS_SECONDS
+                ),
+                batch_size=settings.REMINDER_DISPATCH_BATCH_SIZE,
+            )
+            claimed += count
+            if count < settings.REMINDER_DISPATCH_BATCH_SIZE:
+                break
+    return claimed
+
+
+def prune() -> None:
+    before = datetime.utcnow() - timedelta(days=settings.REMINDER_OCCURRENCE_RETENTION_DAYS)
+    with Session(engine) as session:
+        pruned = crud.prune_dispatched_occurrences(session=session, before=before)
+    if pruned:
+        logger.info(f"Pruned {pruned} dispatched reminder occurrences")
+
+
+def stop(_signum: int, _frame: FrameType | None) -> None:
+    logger.info("Stopping after the current batch")
+    stopping.set()
+
+
+def main() -> None:
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    notifier = get_notifier()
+    logger.info(f"Dispatching reminders with the {settings.REMINDER_NOTIFIER} notifier")
+    next_prune = time.monotonic()
+    while not stopping.is_set():
+        try:
+            claimed = dispatch(notifier)
+            if claimed:
+                logger.info(f"Dispatched {claimed} reminder occurrences")
+            if time.monotonic() >= next_prune:
+                prune()
+                next_prune = time.monotonic() + prune_interval
+        except Exception as e:
+            # The batch rolled back and stays unclaimed for the next poll
+            logger.error(e)
+        stopping.wait(settings.REMINDER_DISPATCH_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from collections.abc import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api import deps
+from app.core.config import settings
+
+
+@pytest.fixture
+def async_queries(monkeypatch: pytest.MonkeyPatch) -> Iterator[list[str]]:
+    """
+    Serve the AsyncSessionDep routes through a real AsyncSession, as with
+    ASYNC_DB_ENABLED, and record the statements it runs.
+    """
+    # No pool: connections must not outlive the test client's event loop
+    async_engine = create_async_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI), poolclass=NullPool
+    )
+    statements: list[str] = []
+
+    def before_cursor_execute(
+        _conn: object, _cursor: object, statement: str, *_args: object
+    ) -> None:
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    monkeypatch.setattr(deps, "async_engine", async_engine)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_async_session_serves_reads_and_writes(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    async_queries: list[str],
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        json={"name": "Luna"},
+    )
+    pet_id = r.json()["id"]
+    client.post(
+        f"{settings.API_V1_STR}/pets/{pet_id}/allergies",
+        headers=normal_user_token_headers,
+        json={"name": "Chicken"},
+    )
+
+    r = client.post(
+        f"{settings.API_V1_STR}/reminders/?pet_id={pet_id}",
+        headers=normal_user_token_headers,
+        json={"category": "Walk", "reminder_time": "08:00:00", "frequency": "Daily"},
+    )
+    assert r.status_code == 200
+    reminder_id = r.json()["id"]
+    r = client.patch(
+        f"{settings.API_V1_STR}/reminders/{reminder_id}",
+        headers=normal_user_token_headers,
+        json={"frequency": "Weekly", "title": "Park"},
+    )
+    assert r.status_code == 200
+    assert r.json()["title"] == "Park"
+
+    # Relationships are loaded eagerly; a lazy load would raise MissingGreenlet
+    r = client.get(
+        f"{settings.API_V1_STR}/pets/{pet_id}/full",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 200
+    assert [allergy["name"] for allergy in r.json()["allergies"]] == ["Chicken"]
+    assert [reminder["id"] for reminder in r.json()["upcoming_reminders"]] == [reminder_id]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/reminders/upcoming",
+        headers=normal_user_token_headers,
+        params={"pet_id": pet_id},
+    )
+    assert r.status_code == 200
+    assert r.json()["count"] > 0
+
+    assert any(statement.startswith("INSERT INTO reminders") for statement in async_queries)
+    assert any(statement.startswith("SELECT pet.") for statement in async_queries)
@@ -0,0 +1,281 @@
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, event
+from sqlmodel import Session, col
+
+from app.core import avatars
+from app.core.config import settings
+from app.core.db import engine
+from app.main import app
+from app.model.pet import Pet
+
+# What the pet detail screen fetched before /full, one request per section
+DETAIL_SECTIONS = [
+    "/pets/{id}",
+    "/pets/{id}/medical-condition",
+    "/pets/{id}/medication",
+    "/pets/{id}/insurance",
+    "/pets/{id}/allergies",
+    "/pets/{id}/vaccinations",
+    "/food-scan-results/{id}",
+    "/reminders/pet/{id}",
+]
+
+@contextmanager
+def count_queries() -> Iterator[list[int]]:
+    count = [0]
+
+    def before_cursor_execute(*_args: object) -> None:
+        count[0] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield count
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_read_pet_full(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        json={"name": "Rex"},
+    )
+    pet_id = r.json()["id"]
+    client.post(
+        f"{settings.API_V1_STR}/pets/{pet_id}/allergies",
+        headers=normal_user_token_headers,
+        json={"name": "Chicken"},
+    )
+
+    with count_queries() as per_section:
+        for section in DETAIL_SECTIONS:
+            r = client.get(
+                settings.API_V1_STR + section.format(id=pet_id),
+                headers=normal_user_token_headers,
+            )
+            assert r.status_code == 200
+    with count_queries() as full:
+        r = client.get(
+            f"{settings.API_V1_STR}/pets/{pet_id}/full",
+            headers=normal_user_token_headers,
+        )
+
+    assert r.status_code == 200
+    pet = r.json()
+    assert pet["name"] == "Rex"
+    assert [allergy["name"] for allergy in pet["allergies"]] == ["Chicken"]
+    assert pet["insurance"] is None
+    assert full[0] < per_section[0]
+
+
+def test_read_pets_cursor(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    for name in ("Ace", "Bo", "Cleo"):
+        client.post(
+            f"{settings.API_V1_STR}/pets/",
+            headers=normal_user_token_headers,
+            json={"name": name},
+        )
+    r = client.get(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        params={"limit": 1000},
+    )
+    expected = [pet["id"] for pet in r.json()["data"]]
+
+    seen: list[str] = []
+    params: dict[str, str | int] = {"limit": 2}
+    while True:
+        r = client.get(
+            f"{settings.API_V1_STR}/pets/",
+            headers=normal_user_token_headers,
+            params=params,
+        )
+        assert r.status_code == 200
+        page = r.json()
+        assert len(page["data"]) <= 2
+        if "cursor" in params:
+            assert page["count"] is None
+        seen.extend(pet["id"] for pet in page["data"])
+        if not page["next_cursor"]:
+            break
+        params = {"limit": 2, "cursor": page["next_cursor"]}
+    # Keyset pages walk the same order as offset paging, without gaps or repeats
+    assert seen == expected
+
+    r = client.get(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+    assert r.status_code == 400
+
+
+def test_add_pet_allergies_batch(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        json={"name": "Bella"},
+    )
+    pet_id = r.json()["id"]
+
+    with count_queries() as queries:
+        r = client.post(
+            f"{settings.API_V1_STR}/pets/{pet_id}/allergies:batch",
+            headers=normal_user_token_headers,
+            json=[{"name": "Beef"}, {"name": "Dairy"}, {"name": "Wheat"}],
+        )
+
+    assert r.status_code == 200
+    assert [allergy["name"] for allergy in r.json()] == ["Beef", "Dairy", "Wheat"]
+    assert all(allergy["pet_id"] == pet_id for allergy in r.json())
+    # pet lookup and one INSERT; the user was cached by the request above
+    assert queries[0] == 2
+
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/{pet_id}/allergies:batch",
+        headers=normal_user_token_headers,
+        json=[],
+    )
+    assert r.status_code == 422
+
+
+def test_pet_ownership_check_skips_loading_the_pet(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    superuser_token_headers: dict[str, str],
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        json={"name": "Milo"},
+    )
+    pet_id = r.json()["id"]
+    url = f"{settings.API_V1_STR}/pets/{pet_id}/allergies"
+
+    client.get(url, headers=normal_user_token_headers)
+    with count_queries() as queries:
+        r = client.get(url, headers=normal_user_token_headers)
+    assert r.status_code == 200
+    # Only the allergies query; the owner comes from the pet owner cache
+    assert queries[0] == 1
+
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 400
+
+    client.delete(f"{settings.API_V1_STR}/pets/{pet_id}", headers=normal_user_token_headers)
+    r = client.get(url, headers=normal_user_token_headers)
+    assert r.status_code == 404
+
+
+def test_pet_writes_skip_the_refresh_select(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        json={"name": "Luna"},
+    )
+    pet_id = r.json()["id"]
+    url = f"{settings.API_V1_STR}/pets/{pet_id}/medication"
+
+    with count_queries() as created:
+        r = client.patch(url, headers=normal_user_token_headers, json={"name": "Apoquel"})
+    assert r.status_code == 200
+    # owner lookup and the upsert; no SELECT after commit
+    assert created[0] == 2
+    medication_id = r.json()["id"]
+
+    with count_queries() as updated:
+        r = client.patch(url, headers=normal_user_token_headers, json={"dosage": "16mg"})
+    assert r.status_code == 200
+    assert r.json()["name"] == "Apoquel"
+    assert r.json()["dosage"] == "16mg"
+    # INSERT ... ON CONFLICT (pet_id) DO UPDATE ... RETURNING
+    assert updated[0] == 1
+    assert r.json()["id"] == medication_id
+
+    with count_queries() as added:
+        r = client.post(
+            f"{settings.API_V1_STR}/pets/{pet_id}/vaccinations",
+            headers=normal_user_token_headers,
+            json={"name": "Rabies"},
+        )
+    assert r.status_code == 200
+    assert r.json()["name"] == "Rabies"
+    assert added[0] == 1
+
+
+def test_write_to_pet_deleted_by_another_worker_is_404(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        json={"name": "Milo"},
+    )
+    pet_id = r.json()["id"]
+    client.get(
+        f"{settings.API_V1_STR}/pets/{pet_id}/allergies",
+        headers=normal_user_token_headers,
+    )
+    # Deleted without going through this worker's cache invalidation
+    db.exec(delete(Pet).where(col(Pet.id) == uuid.UUID(pet_id)))  # type: ignore
+    db.commit()
+
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/{pet_id}/allergies",
+        headers=normal_user_token_headers,
+        json={"name": "Chicken"},
+    )
+    assert r.status_code == 404
+    assert r.json() == {"detail": "Pet not found"}
+
+
+def test_upload_avatar_after_a_previous_lifespan(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(avatars, "AVATAR_DIR", tmp_path)
+    # Another app lifespan starting and stopping shuts down the avatar pool
+    with TestClient(app):
+        pass
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        json={"name": "Pixel"},
+    )
+    pet_id = r.json()["id"]
+    ok, png = cv2.imencode(".png", np.full((600, 800, 3), 200, dtype=np.uint8))
+    assert ok
+
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/{pet_id}/avatar",
+        headers=normal_user_token_headers,
+        files={"file": ("avatar.png", png.tobytes(), "image/png")},
+    )
+
+    assert r.status_code == 200
+    avatar = r.json()["avatar"]
+    assert avatar.startswith(f"/images/avatar/{pet_id}/")
+    version_dir = tmp_path / pet_id / avatar.split("/")[-2]
+    assert sorted(path.stem for path in version_dir.iterdir()) == [
+        "full",
+        "medium",
+        "thumbnail",
+    ]
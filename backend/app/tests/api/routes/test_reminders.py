@@ -0,0 +1,163 @@
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_upcoming_reminders_follow_the_schedule(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        json={"name": "Nala"},
+    )
+    pet_id = r.json()["id"]
+    start = date.today() + timedelta(days=1)
+    r = client.post(
+        f"{settings.API_V1_STR}/reminders/?pet_id={pet_id}",
+        headers=normal_user_token_headers,
+        json={
+            "category": "Medication",
+            "reminder_time": "20:00:00",
+            "frequency": "Every 2 days",
+            "start_date": start.isoformat(),
+        },
+    )
+    reminder_id = r.json()["id"]
+    window = {
+        "from": f"{start.isoformat()}T00:00:00",
+        "to": f"{(start + timedelta(days=6)).isoformat()}T00:00:00",
+        "pet_id": pet_id,
+    }
+
+    r = client.get(
+        f"{settings.API_V1_STR}/reminders/upcoming",
+        headers=normal_user_token_headers,
+        params=window,
+    )
+    assert r.status_code == 200
+    assert [o["fire_at"] for o in r.json()["data"]] == [
+        f"{(start + timedelta(days=n)).isoformat()}T20:00:00" for n in (0, 2, 4)
+    ]
+    assert r.json()["data"][0]["reminder"]["id"] == reminder_id
+
+    client.patch(
+        f"{settings.API_V1_STR}/reminders/{reminder_id}",
+        headers=normal_user_token_headers,
+        json={"frequency": "Never"},
+    )
+    r = client.get(
+        f"{settings.API_V1_STR}/reminders/upcoming",
+        headers=normal_user_token_headers,
+        params=window,
+    )
+    assert [o["fire_at"] for o in r.json()["data"]] == [f"{start.isoformat()}T20:00:00"]
+
+
+def test_upcoming_reminders_are_in_utc(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        json={"name": "Kiki"},
+    )
+    pet_id = r.json()["id"]
+    day = date.today() + timedelta(days=2)
+    r = client.post(
+        f"{settings.API_V1_STR}/reminders/?pet_id={pet_id}",
+        headers=normal_user_token_headers,
+        json={
+            "category": "Walk",
+            "reminder_time": "09:00:00",
+            "frequency": "Never",
+            "reminder_date": day.isoformat(),
+            "timezone": "America/New_York",
+        },
+    )
+    assert r.status_code == 200
+    assert r.json()["timezone"] == "America/New_York"
+
+    r = client.get(
+        f"{settings.API_V1_STR}/reminders/upcoming",
+        headers=normal_user_token_headers,
+        params={"pet_id": pet_id, "to": f"{(day + timedelta(days=1)).isoformat()}T12:00:00"},
+    )
+    fire_at = (
+        datetime.combine(day, time(9), ZoneInfo("America/New_York"))
+        .astimezone(timezone.utc)
+        .replace(tzinfo=None)
+    )
+    assert [o["fire_at"] for o in r.json()["data"]] == [fire_at.isoformat()]
+
+
+def test_reminder_timezone_and_upcoming_limit_are_validated(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        json={"name": "Bao"},
+    )
+    pet_id = r.json()["id"]
+    r = client.post(
+        f"{settings.API_V1_STR}/reminders/?pet_id={pet_id}",
+        headers=normal_user_token_headers,
+        json={
+            "category": "Walk",
+            "reminder_time": "09:00:00",
+            "frequency": "Daily",
+            "timezone": "Mars/Olympus_Mons",
+        },
+    )
+    assert r.status_code == 422
+
+    r = client.get(
+        f"{settings.API_V1_STR}/reminders/upcoming",
+        headers=normal_user_token_headers,
+        params={"limit": 100_000},
+    )
+    assert r.status_code == 422
+
+
+def test_read_pet_reminders_cursor(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/pets/",
+        headers=normal_user_token_headers,
+        json={"name": "Pip"},
+    )
+    pet_id = r.json()["id"]
+    r = client.post(
+        f"{settings.API_V1_STR}/reminders/pet/{pet_id}:batch",
+        headers=normal_user_token_headers,
+        json=[
+            {"category": category, "reminder_time": "09:00:00", "frequency": "Daily"}
+            for category in ("Walk", "Food", "Medication")
+        ],
+    )
+    created = {reminder["id"] for reminder in r.json()}
+    url = f"{settings.API_V1_STR}/reminders/pet/{pet_id}"
+
+    r = client.get(url, headers=normal_user_token_headers, params={"limit": 2})
+    first_page = r.json()
+    assert len(first_page["data"]) == 2
+    assert first_page["count"] == 3
+    assert first_page["next_cursor"]
+
+    r = client.get(
+        url,
+        headers=normal_user_token_headers,
+        params={"limit": 2, "cursor": first_page["next_cursor"]},
+    )
+    second_page = r.json()
+    assert r.status_code == 200
+    assert len(second_page["data"]) == 1
+    assert second_page["count"] is None
+    assert second_page["next_cursor"] is None
+    pages = first_page["data"] + second_page["data"]
+    assert {reminder["id"] for reminder in pages} == created
@@ -0,0 +1,139 @@
+import json
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.api.routes import utils
+from app.core.barcodes import DecodedBarcode, barcode_decoder
+from app.core.config import settings
+from app.model.barcode_product import BarcodeProductCreate
+from app.tests.utils.utils import random_lower_string
+
+
+class FakeLLM:
+    def __init__(self, product: dict[str, Any]) -> None:
+        self.product = product
+        self.calls = 0
+
+    async def ainvoke(self, messages: Any) -> Any:
+        self.calls += 1
+        return type("Response", (), {"content": json.dumps(self.product)})()
+
+
+def _product(barcode: str, name: str) -> dict[str, Any]:
+    return {
+        "barcode": barcode,
+        "product_name": name,
+        "brand": "Acme",
+        "categories": [],
+        "nutrition_facts": {},
+    }
+
+
+def _scan(client: TestClient, barcode: str, llm: FakeLLM) -> Any:
+    decoded = DecodedBarcode(data=barcode, type="EAN13", strategy="original")
+    with (
+        patch.object(barcode_decoder, "decode", AsyncMock(return_value=decoded)),
+        patch.object(utils, "openai_llm", llm),
+    ):
+        r = client.post(
+            f"{settings.API_V1_STR}/utils/scan-barcode",
+            files={"file": ("scan.png", b"not decoded", "image/png")},
+        )
+    assert r.status_code == 200
+    return r.json()["data"]
+
+
+def test_scan_barcode_uses_imported_product(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    barcode = random_lower_string()
+    r = client.post(
+        f"{settings.API_V1_STR}/utils/barcode-products/import",
+        headers=superuser_token_headers,
+        json={
+            "data": [
+                {
+                    "barcode_data": barcode,
+                    "barcode_type": "EAN13",
+                    "product_data": _product(barcode, "Imported"),
+                }
+            ]
+        },
+    )
+    assert r.status_code == 200
+    llm = FakeLLM(_product(barcode, "Generated"))
+
+    assert _scan(client, barcode, llm)["product_name"] == "Imported"
+    assert llm.calls == 0
+
+
+def test_scan_barcode_generates_once_then_hits(client: TestClient) -> None:
+    barcode = random_lower_string()
+    llm = FakeLLM(_product(barcode, "Generated"))
+
+    assert _scan(client, barcode, llm)["product_name"] == "Generated"
+    assert _scan(client, barcode, llm)["product_name"] == "Generated"
+    assert llm.calls == 1
+
+
+def test_scan_barcode_refreshes_expired_product(client: TestClient, db: Session) -> None:
+    barcode = random_lower_string()
+    crud.save_barcode_products(
+        session=db,
+        products_in=[
+            BarcodeProductCreate(
+                barcode_data=barcode,
+                barcode_type="EAN13",
+                product_data=_product(barcode, "Old"),
+            )
+        ],
+        version=utils.BARCODE_PRODUCT_VERSION,
+        expires_at=datetime.utcnow() - timedelta(minutes=1),
+    )
+    llm = FakeLLM(_product(barcode, "Fresh"))
+
+    assert _scan(client, barcode, llm)["product_name"] == "Fresh"
+    assert llm.calls == 1
+
+
+def test_barcode_product_stats(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    before = utils.barcode_cache_stats.as_dict()
+    _scan(client, random_lower_string(), FakeLLM(_product("x", "Generated")))
+
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/barcode-products/stats",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    stats = r.json()
+    assert stats["misses"] == before["misses"] + 1
+    assert {"hits", "stale", "hit_rate", "decode"} <= stats.keys()
+
+
+def test_barcode_product_stats_requires_superuser(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/barcode-products/stats",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 403
+
+
+def test_import_barcode_products_is_bounded(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    product = {"barcode_data": "0", "barcode_type": "EAN13", "product_data": {}}
+    r = client.post(
+        f"{settings.API_V1_STR}/utils/barcode-products/import",
+        headers=superuser_token_headers,
+        json={"data": [product] * (settings.BATCH_MAX_SIZE + 1)},
+    )
+    assert r.status_code == 422
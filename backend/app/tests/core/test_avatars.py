@@ -0,0 +1,115 @@
+import asyncio
+import io
+import os
+import uuid
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+from fastapi import HTTPException, UploadFile
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+
+from app.core import avatars
+from app.core.avatars import render_avatar, spool_upload
+
+
+def _png(width: int, height: int) -> bytes:
+    ok, buffer = cv2.imencode(".png", np.full((height, width, 3), 200, np.uint8))
+    assert ok
+    return buffer.tobytes()
+
+
+def _spool(data: bytes, max_bytes: int) -> Path:
+    return asyncio.run(spool_upload(UploadFile(io.BytesIO(data)), max_bytes))
+
+
+def test_spool_upload_validates_magic_bytes_and_size() -> None:
+    data = _png(64, 48)
+    path = _spool(data, max_bytes=len(data))
+    assert path.read_bytes() == data
+    path.unlink()
+
+    with pytest.raises(HTTPException) as exc:
+        _spool(b"not an image", max_bytes=1024)
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException) as exc:
+        _spool(data, max_bytes=len(data) - 1)
+    assert exc.value.status_code == 413
+
+
+def test_render_avatar_writes_each_rendition(tmp_path: Path) -> None:
+    source = tmp_path / "upload"
+    source.write_bytes(_png(2000, 1000))
+
+    version = render_avatar(source, tmp_path / "pet", "webp", 80)
+
+    digest, name = version.split("/")
+    assert name == "full.webp"
+    assert render_avatar(source, tmp_path / "pet", "webp", 80) == version
+    sizes = {}
+    for path in (tmp_path / "pet" / digest).iterdir():
+        image = cv2.imread(str(path))
+        assert image is not None
+        sizes[path.stem] = image.shape[:2]
+    assert sizes == {"thumbnail": (64, 128), "medium": (256, 512), "full": (512, 1024)}
+
+
+def test_collect_orphaned_avatars(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(avatars, "AVATAR_DIR", tmp_path)
+    current = tmp_path / "pet-1" / ("a" * 32)
+    replaced = tmp_path / "pet-1" / ("b" * 32)
+    for directory in (current, replaced, tmp_path / "pet-2" / ("c" * 32)):
+        directory.mkdir(parents=True)
+        (directory / "full.webp").write_bytes(b"x")
+    (tmp_path / "pet-1.png").write_bytes(b"x")
+
+    referenced = {"pet-1": f"/images/avatar/pet-1/{'a' * 32}/full.webp"}
+    assert avatars.collect_orphaned_avatars(referenced, grace_seconds=60) == 0
+    assert avatars.collect_orphaned_avatars(referenced, grace_seconds=-1) == 3
+
+    assert [path.name for path in tmp_path.iterdir()] == ["pet-1"]
+    assert list((tmp_path / "pet-1").iterdir()) == [current]
+
+
+def test_versioned_avatars_are_immutable(tmp_path: Path) -> None:
+    version_dir = tmp_path / "images" / "avatar" / "pet-1" / ("a" * 32)
+    version_dir.mkdir(parents=True)
+    (version_dir / "full.webp").write_bytes(b"x")
+    (tmp_path / "other.png").write_bytes(b"x")
+    app = Starlette()
+    app.mount("/upload", avatars.UploadStaticFiles(directory=tmp_path))
+    client = TestClient(app)
+
+    response = client.get(f"/upload/images/avatar/pet-1/{'a' * 32}/full.webp")
+    assert response.headers["cache-control"] == avatars.IMMUTABLE_CACHE_CONTROL
+    assert response.headers["etag"] == f'"{"a" * 32}-full"'
+    not_modified = client.get(
+        f"/upload/images/avatar/pet-1/{'a' * 32}/full.webp",
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+    assert not_modified.status_code == 304
+    assert "cache-control" not in client.get("/upload/other.png").headers
+
+
+def test_replaced_avatar_grace_starts_at_replacement(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(avatars, "AVATAR_DIR", tmp_path)
+    pet_id = uuid.uuid4()
+    old, new = tmp_path / str(pet_id) / ("a" * 32), tmp_path / str(pet_id) / ("b" * 32)
+    for directory in (old, new):
+        directory.mkdir(parents=True)
+        (directory / "full.webp").write_bytes(b"x")
+    # Uploaded long before it was replaced
+    os.utime(old, (0, 0))
+    current = f"/images/avatar/{pet_id}/{'b' * 32}/full.webp"
+    replaced = f"/images/avatar/{pet_id}/{'a' * 32}/full.webp"
+
+    assert avatars.prune_avatar_versions(pet_id, current, 60, replaced) == 0
+    assert old.is_dir()
+
+    os.utime(old, (0, 0))
+    assert avatars.prune_avatar_versions(pet_id, current, 60) == 1
+    assert list((tmp_path / str(pet_id)).iterdir()) == [new]
@@ -0,0 +1,138 @@
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+
+from app.core import barcodes
+from app.core.barcodes import (
+    BarcodeDecoder,
+    DecodedBarcode,
+    DecodeOutcome,
+    decode_barcode,
+)
+
+EAN13_L = ["0001101", "0011001", "0010011", "0111101", "0100011",
+           "0110001", "0101111", "0111011", "0110111", "0001011"]
+EAN13_PARITY = ["LLLLLL", "LLGLGG", "LLGGLG", "LLGGGL", "LGLLGG",
+                "LGGLLG", "LGGGLL", "LGLGLG", "LGLGGL", "LGGLGL"]
+
+
+def _ean13_png(digits: str, module: int = 3) -> bytes:
+    right = ["".join("1" if bit == "0" else "0" for bit in code) for code in EAN13_L]
+    left = "".join(
+        EAN13_L[int(d)] if parity == "L" else right[int(d)][::-1]
+        for d, parity in zip(digits[1:7], EAN13_PARITY[int(digits[0])], strict=True)
+    )
+    bits = "101" + left + "01010" + "".join(right[int(d)] for d in digits[7:]) + "101"
+    row = np.array([0 if bit == "1" else 255 for bit in bits], dtype=np.uint8)
+    bars = np.repeat(np.tile(row, (80, 1)), module, axis=1)
+    # Quiet zone of 15 modules either side
+    quiet = 15 * module
+    image = cv2.copyMakeBorder(bars, 20, 20, quiet, quiet, cv2.BORDER_CONSTANT, value=255)
+    ok, buffer = cv2.imencode(".png", image)
+    assert ok
+    return buffer.tobytes()
+
+
+def test_decode_barcode_reads_generated_ean13() -> None:
+    outcome = decode_barcode(_ean13_png("5901234123457"))
+
+    assert outcome.barcode == DecodedBarcode(
+        data="5901234123457", type="EAN13", strategy="downscaled"
+    )
+    assert [strategy for strategy, _ in outcome.timings] == ["downscaled"]
+
+
+def test_decode_barcode_escalates_in_order() -> None:
+    calls: list[tuple[int, ...]] = []
+
+    def decode(candidate: np.ndarray) -> list[Any]:
+        calls.append(candidate.shape)
+        if len(calls) < 3:
+            return []
+        return [type("Found", (), {"data": b"42", "type": "QRCODE"})()]
+
+    with patch.object(barcodes, "decode", decode):
+        outcome = decode_barcode(_ean13_png("5901234123457"))
+
+    assert outcome.barcode is not None
+    assert outcome.barcode.strategy == "adaptive_threshold"
+    assert [strategy for strategy, _ in outcome.timings] == [
+        "downscaled",
+        "full",
+        "adaptive_threshold",
+    ]
+
+
+def test_decode_barcode_tries_every_strategy_before_giving_up() -> None:
+    with patch.object(barcodes, "decode", lambda candidate: []):
+        outcome = decode_barcode(_ean13_png("5901234123457"))
+
+    assert outcome.barcode is None
+    assert [strategy for strategy, _ in outcome.timings] == [
+        "downscaled",
+        "full",
+        "adaptive_threshold",
+        "rotation",
+        "roi_crop",
+    ]
+
+
+def test_decoder_keeps_per_strategy_stats() -> None:
+    decoder = BarcodeDecoder(max_workers=1)
+    outcomes = [
+        DecodeOutcome(barcode=None, timings=[("downscaled", 0.01), ("full", 0.02)]),
+        DecodeOutcome(
+            barcode=DecodedBarcode(data="42", type="EAN13", strategy="full"),
+            timings=[("downscaled", 0.03), ("full", 0.04)],
+        ),
+    ]
+
+    async def run() -> None:
+        # The default thread pool stands in for the process pool
+        with (
+            patch.object(decoder, "_get_pool", lambda: None),
+            patch.object(decoder, "decode_fn", side_effect=outcomes),
+        ):
+            assert await decoder.decode(b"") is None
+            assert await decoder.decode(b"") == outcomes[1].barcode
+
+    asyncio.run(run())
+    stats = decoder.stats()
+    assert stats["downscaled"] == {
+        "attempts": 2,
+        "hits": 0,
+        "decode_rate": 0.0,
+        "p95_ms": 30.0,
+    }
+    assert stats["full"]["attempts"] == 2
+    assert stats["full"]["hits"] == 1
+    assert stats["full"]["decode_rate"] == 0.5
+
+
+def _crash(_image_data: bytes) -> DecodeOutcome:
+    os._exit(1)
+
+
+def _no_barcode(_image_data: bytes) -> DecodeOutcome:
+    return DecodeOutcome(barcode=None, timings=[])
+
+
+def test_decoder_replaces_a_broken_pool() -> None:
+    decoder = BarcodeDecoder(max_workers=1, decode_fn=_crash)
+
+    async def run() -> None:
+        with pytest.raises(BrokenProcessPool):
+            await decoder.decode(b"")
+        decoder.decode_fn = _no_barcode
+        assert await decoder.decode(b"") is None
+
+    try:
+        asyncio.run(run())
+    finally:
+        decoder.shutdown()
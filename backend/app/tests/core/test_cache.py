@@ -0,0 +1,94 @@
+import asyncio
+from unittest.mock import patch
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.core.cache import LRUCache
+from app.core.rag import CachedEmbeddings
+from app.tests.utils.cache import BrokenRedis, FakeRedis
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    calls: int = 0
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls += 1
+        return super().embed_query(text)
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache: LRUCache[int] = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_expires_entries() -> None:
+    cache: LRUCache[int] = LRUCache(maxsize=10, ttl=5)
+    with patch("app.core.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+    with patch("app.core.cache.time.monotonic", return_value=104.0):
+        assert cache.get("a") == 1
+    with patch("app.core.cache.time.monotonic", return_value=106.0):
+        assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cached_embeddings_reuse_normalised_queries() -> None:
+    inner = CountingEmbeddings(size=8)
+    embeddings = CachedEmbeddings(
+        inner, model="test-model", local=LRUCache(maxsize=10)
+    )
+    first = embeddings.embed_query("Can dogs eat grapes?")
+    second = asyncio.run(embeddings.aembed_query("  can DOGS eat   grapes? "))
+    assert first == second
+    assert inner.calls == 1
+
+
+def test_cached_embeddings_shared_tier() -> None:
+    shared = FakeRedis()
+    inner = CountingEmbeddings(size=8)
+    worker_a = CachedEmbeddings(
+        inner, model="test-model", local=LRUCache(maxsize=10), shared=shared
+    )
+    worker_b = CachedEmbeddings(
+        inner, model="test-model", local=LRUCache(maxsize=10), shared=shared
+    )
+    worker_a.embed_query("can dogs eat grapes?")
+    worker_b.embed_query("can dogs eat grapes?")
+    assert inner.calls == 1
+    assert worker_b.stats()["shared_hits"] == 1
+
+    other_model = CachedEmbeddings(
+        inner, model="other-model", local=LRUCache(maxsize=10), shared=shared
+    )
+    other_model.embed_query("can dogs eat grapes?")
+    assert inner.calls == 2
+
+
+def test_cached_embeddings_shared_failure_embeds_the_query() -> None:
+    inner = CountingEmbeddings(size=8)
+    embeddings = CachedEmbeddings(
+        inner, model="test-model", local=LRUCache(maxsize=10), shared=BrokenRedis()
+    )
+    vector = asyncio.run(embeddings.aembed_query("can dogs eat grapes?"))
+    assert vector == inner.embed_query("can dogs eat grapes?")
+    # Still cached in-process
+    assert embeddings.embed_query("can dogs eat grapes?") == vector
+    assert inner.calls == 2
+
+
+def test_cached_embeddings_local_only_stays_on_the_loop() -> None:
+    embeddings = CachedEmbeddings(
+        CountingEmbeddings(size=8), model="test-model", local=LRUCache(maxsize=10)
+    )
+    with patch("app.core.rag.asyncio.to_thread") as to_thread:
+        asyncio.run(embeddings.aembed_query("can dogs eat grapes?"))
+    to_thread.assert_not_called()
+    assert len(embeddings.local) == 1
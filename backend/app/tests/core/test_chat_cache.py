@@ -0,0 +1,42 @@
+import asyncio
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.chat_cache import ChatResponseCache
+
+
+class KeywordEmbeddings(Embeddings):
+    """Embeds text by which of a few keywords it mentions."""
+
+    keywords = ["grape", "chocolate", "walk"]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [float(word in text.lower()) for word in self.keywords] + [0.1]
+
+
+def test_chat_cache_exact_match() -> None:
+    cache = ChatResponseCache(maxsize=10, ttl=60)
+    asyncio.run(cache.aset("prompt", "gpt-4o", "Can dogs eat grapes?", "No."))
+
+    assert asyncio.run(cache.aget("prompt", "gpt-4o", "can dogs  eat grapes?")) == "No."
+    assert asyncio.run(cache.aget("other prompt", "gpt-4o", "Can dogs eat grapes?")) is None
+    assert asyncio.run(cache.aget("prompt", "gpt-4o-mini", "Can dogs eat grapes?")) is None
+
+
+def test_chat_cache_similar_question() -> None:
+    cache = ChatResponseCache(
+        maxsize=10,
+        ttl=60,
+        similarity_threshold=0.95,
+        embeddings_factory=KeywordEmbeddings,
+    )
+    asyncio.run(cache.aset("prompt", "gpt-4o", "Can dogs eat grapes?", "No."))
+
+    hit = asyncio.run(cache.aget("prompt", "gpt-4o", "Are grapes safe for my dog?"))
+    assert hit == "No."
+    miss = asyncio.run(cache.aget("prompt", "gpt-4o", "Is chocolate bad for dogs?"))
+    assert miss is None
+    assert cache.stats()["similar_hits"] == 1
@@ -0,0 +1,68 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Engine, create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from app.core.db_pool import PoolStats, engine_options, track_in_use
+
+
+@pytest.fixture
+def pooled_engine(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[tuple[Engine, PoolStats]]:
+    monkeypatch.setattr("app.core.db_pool.settings.DB_POOL_SIZE", 1)
+    monkeypatch.setattr("app.core.db_pool.settings.DB_MAX_OVERFLOW", 1)
+    monkeypatch.setattr("app.core.db_pool.settings.DB_POOL_TIMEOUT", 0.05)
+    stats = PoolStats()
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", **engine_options(QueuePool, stats)
+    )
+    track_in_use(engine, stats)
+    yield engine, stats
+    engine.dispose()
+
+
+def test_pool_stats_count_overflow_and_timeouts(pooled_engine: tuple[Engine, PoolStats]) -> None:
+    engine, stats = pooled_engine
+
+    first = engine.connect()
+    second = engine.connect()
+    assert stats.in_use == 2
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    first.close()
+    second.close()
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    summary = stats.as_dict()
+    assert summary["checkouts"] == 3
+    assert summary["overflow_hits"] == 1
+    assert summary["timeouts"] == 1
+    assert summary["in_use"] == 0
+    assert summary["peak_in_use"] == 2
+    assert summary["checkout_max_ms"] >= 50
+
+
+def test_pool_survives_dispose(pooled_engine: tuple[Engine, PoolStats]) -> None:
+    engine, stats = pooled_engine
+
+    engine.dispose()
+    with engine.connect():
+        pass
+
+    assert stats.checkouts == 1
+
+
+
+def test_pool_stats_p95() -> None:
+    stats = PoolStats()
+    stats.samples.append(0.002)
+    assert stats.as_dict()["checkout_p95_ms"] == 2.0
+
+    stats.samples.clear()
+    stats.samples.extend(n / 1000 for n in range(1, 11))
+    assert stats.as_dict()["checkout_p95_ms"] == 10.0
@@ -0,0 +1,44 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+from app.core.debug_capture import DebugCapture
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+def _capture(directory: Path, **overrides: object) -> DebugCapture:
+    options: dict[str, Any] = {
+        "enabled": True,
+        "sample_rate": 1.0,
+        "directory": directory,
+        "max_bytes": 1024,
+        "max_files": 3,
+    }
+    options.update(overrides)
+    return DebugCapture(**options)
+
+
+def _run(capture: DebugCapture, payloads: list[bytes]) -> None:
+    async def main() -> None:
+        for payload in payloads:
+            capture.capture("avatar", payload)
+            await capture.drain()
+
+    asyncio.run(main())
+
+
+def test_debug_capture_disabled_writes_nothing(tmp_path: Path) -> None:
+    _run(_capture(tmp_path, enabled=False), [PNG])
+    _run(_capture(tmp_path, sample_rate=0.0), [PNG])
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_debug_capture_writes_unique_files_and_rotates(tmp_path: Path) -> None:
+    _run(_capture(tmp_path), [PNG] * 5 + [PNG + b"\x00" * 2048])
+
+    captures = list(tmp_path.iterdir())
+    assert len(captures) == 3
+    assert all(path.name.startswith("avatar-") for path in captures)
+    assert all(path.suffix == ".png" for path in captures)
@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+
+from app.core.images import FoodAnalysisCache, prepare_for_vision
+
+
+def _encode(image: np.ndarray, quality: int) -> bytes:
+    ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    assert ok
+    return buffer.tobytes()
+
+
+def _photo() -> np.ndarray:
+    gradient = np.tile(np.linspace(0, 255, 320, dtype=np.uint8), (240, 1))
+    image = cv2.merge([gradient, gradient[::-1], np.full_like(gradient, 128)])
+    cv2.circle(image, (160, 120), 60, (0, 0, 255), -1)
+    return image
+
+
+def test_food_analysis_cache_exact_match() -> None:
+    cache = FoodAnalysisCache(maxsize=4, ttl=None)
+    original = _encode(_photo(), 95)
+    cache.set(original, "v1", {"foodItems": []})
+
+    assert cache.get(original, "v1") == {"foodItems": []}
+    assert cache.get(original, "v2") is None
+    assert cache.get(_encode(_photo(), 60), "v1") is None
+
+
+def test_food_analysis_cache_perceptual_match() -> None:
+    cache = FoodAnalysisCache(maxsize=4, ttl=None, perceptual=True, max_distance=4)
+    cache.set(_encode(_photo(), 95), "v1", {"foodItems": []})
+
+    recompressed = _encode(_photo(), 60)
+    assert cache.get(recompressed, "v1") == {"foodItems": []}
+    different = _encode(cv2.flip(_photo(), 1), 95)
+    assert cache.get(different, "v1") is None
+    assert cache.stats()["perceptual_hits"] == 1
+
+
+def test_prepare_for_vision_downscales_to_jpeg() -> None:
+    large = cv2.resize(_photo(), (4000, 3000))
+    ok, png = cv2.imencode(".png", large)
+    assert ok
+
+    jpeg = prepare_for_vision(png.tobytes(), max_dimension=1024, quality=85)
+
+    assert jpeg[:2] == b"\xff\xd8"
+    decoded = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    assert decoded is not None
+    assert decoded.shape[:2] == (768, 1024)
+    assert len(jpeg) < len(png)
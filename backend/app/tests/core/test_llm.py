@@ -0,0 +1,67 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from starlette.requests import ClientDisconnect, Request
+from starlette.types import Message
+
+from app.api.routes import chat
+from app.core.llm import LLMLimiter
+
+
+async def _receive() -> Message:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "POST", "headers": []}, _receive)
+
+
+def test_limiter_release_is_idempotent() -> None:
+    limiter = LLMLimiter(max_concurrency=1, max_queue=0)
+
+    async def run() -> None:
+        release = await limiter.acquire()
+        assert limiter.pending == 1
+        release()
+        release()
+        assert limiter.pending == 0
+        async with limiter.slot():
+            assert limiter.pending == 1
+
+    asyncio.run(run())
+    assert limiter.pending == 0
+
+
+def test_stream_frees_slot_when_body_never_starts() -> None:
+    limiter = LLMLimiter(max_concurrency=1, max_queue=0)
+
+    async def send(message: Message) -> None:
+        raise OSError("client went away")
+
+    async def run() -> None:
+        response = await chat._event_stream(
+            _request(), lambda: chat._single_chunk("hello")
+        )
+        assert limiter.pending == 1
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+        with pytest.raises(ClientDisconnect):
+            await response(scope, _receive, send)
+
+    with patch.object(chat, "llm_limiter", limiter):
+        asyncio.run(run())
+    assert limiter.pending == 0
+
+
+def test_cached_stream_skips_ttft() -> None:
+    stats = chat.StreamStats()
+
+    async def run() -> list[str]:
+        events = chat._sse_events(_request(), chat._single_chunk("hello"))
+        return [event async for event in events]
+
+    with patch.object(chat, "stream_stats", stats):
+        events = asyncio.run(run())
+    assert events[-1].startswith("event: done")
+    assert stats.streams == 1
+    assert stats.ttft_samples == 0
@@ -0,0 +1,66 @@
+import asyncio
+import uuid
+
+from app.core.principal import PetOwnerCache, Principal, PrincipalCache
+from app.tests.utils.cache import BrokenRedis, FakeRedis
+
+
+def test_principal_cache_local() -> None:
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    principal = Principal(id=uuid.uuid4(), is_active=True, is_superuser=False)
+
+    assert cache.get(principal.id) is None
+    cache.set(principal)
+    assert cache.get(str(principal.id)) == principal
+    cache.invalidate(principal.id)
+    assert cache.get(principal.id) is None
+
+
+def test_principal_cache_shared_is_seen_by_every_worker() -> None:
+    shared = FakeRedis()
+    worker_a = PrincipalCache(maxsize=10, ttl=60, shared=shared)
+    worker_b = PrincipalCache(maxsize=10, ttl=60, shared=shared)
+    principal = Principal(id=uuid.uuid4(), is_active=True, is_superuser=True)
+
+    worker_a.set(principal)
+    assert worker_b.get(principal.id) == principal
+    worker_b.invalidate(principal.id)
+    assert worker_a.get(principal.id) is None
+
+
+def test_principal_cache_shared_failure_is_a_miss() -> None:
+    cache = PrincipalCache(maxsize=10, ttl=60, shared=BrokenRedis())
+    principal = Principal(id=uuid.uuid4(), is_active=True, is_superuser=False)
+
+    cache.set(principal)
+    assert cache.get(principal.id) is None
+    cache.invalidate(principal.id)
+
+
+def test_pet_owner_cache_invalidation_reaches_every_worker() -> None:
+    shared = FakeRedis()
+    worker_a = PetOwnerCache(maxsize=10, ttl=60, shared=shared)
+    worker_b = PetOwnerCache(maxsize=10, ttl=60, shared=shared)
+    pet_id, owner_id = uuid.uuid4(), uuid.uuid4()
+
+    worker_a.set(pet_id, owner_id)
+    assert asyncio.run(worker_b.aget(pet_id)) == owner_id
+    worker_a.invalidate(pet_id)
+    assert worker_b.get(pet_id) is None
+
+
+def test_pet_owner_cache_shared_failure_is_a_miss() -> None:
+    cache = PetOwnerCache(maxsize=10, ttl=60, shared=BrokenRedis())
+    pet_id = uuid.uuid4()
+
+    cache.set(pet_id, uuid.uuid4())
+    assert cache.get(pet_id) is None
+    cache.invalidate(pet_id)
+
+
+def test_pet_owner_cache_can_be_disabled() -> None:
+    cache = PetOwnerCache(maxsize=0, ttl=60)
+    pet_id = uuid.uuid4()
+
+    cache.set(pet_id, uuid.uuid4())
+    assert cache.get(pet_id) is None
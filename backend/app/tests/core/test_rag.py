@@ -0,0 +1,53 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+from langchain_core.vectorstores import InMemoryVectorStore, VectorStore
+
+from app.core.rag import RAGPipeline
+
+
+def test_rag_pipeline_builds_clients_once() -> None:
+    built: list[VectorStore] = []
+
+    def factory(_embeddings: Embeddings) -> VectorStore:
+        store = InMemoryVectorStore(DeterministicFakeEmbedding(size=8))
+        store.add_documents([Document(page_content="Grapes are toxic to dogs.")])
+        built.append(store)
+        return store
+
+    pipeline = RAGPipeline(vectorstore_factory=factory, top_k=1)
+    with patch("app.core.rag.OPENAI_API_KEY", "sk-test"):
+        pipeline.start()
+        for _ in range(3):
+            docs = asyncio.run(pipeline.retrieve("can dogs eat grapes?"))
+            assert docs[0].page_content == "Grapes are toxic to dogs."
+        assert pipeline.chat is pipeline.chat
+
+    assert len(built) == 1
+    assert pipeline.metrics()["builds"] == 1
+    assert pipeline.metrics()["requests"] == 3
+
+    asyncio.run(pipeline.aclose())
+    assert not pipeline.ready
+
+
+def test_rag_pipeline_closes_clients_when_build_fails() -> None:
+    def factory(_embeddings: Embeddings) -> VectorStore:
+        raise RuntimeError("index unavailable")
+
+    pipeline = RAGPipeline(vectorstore_factory=factory)
+    with (
+        patch("app.core.rag.OPENAI_API_KEY", "sk-test"),
+        patch("httpx.Client.close") as close,
+        patch("httpx.AsyncClient.aclose") as aclose,
+    ):
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                pipeline.start()
+
+    assert close.call_count == 2
+    assert aclose.await_count == 2
+    assert not pipeline.ready
@@ -0,0 +1,123 @@
+from datetime import date, datetime, time
+
+import pytest
+
+from app.core.recurrence import RecurrenceRule, occurrences, parse_frequency
+from app.models import Reminder
+
+
+@pytest.mark.parametrize(
+    ("frequency", "expected"),
+    [
+        ("Daily", ("day", 1)),
+        (" weekly ", ("week", 1)),
+        ("Every 3 days", ("day", 3)),
+        ("every month", ("month", 1)),
+        ("Every 2 years", ("month", 24)),
+        ("Never", None),
+        ("whenever he looks hungry", None),
+    ],
+)
+def test_parse_frequency(frequency: str, expected: tuple[str, int] | None) -> None:
+    assert parse_frequency(frequency) == expected
+
+
+def test_between_skips_ahead_without_walking_history() -> None:
+    rule = RecurrenceRule(first=datetime(2020, 1, 1, 8), unit="hour", interval=6)
+
+    found = list(rule.between(datetime(2026, 3, 1, 9), datetime(2026, 3, 2)))
+
+    assert found == [
+        datetime(2026, 3, 1, 14),
+        datetime(2026, 3, 1, 20),
+    ]
+
+
+def test_monthly_keeps_day_of_month_and_clamps() -> None:
+    rule = RecurrenceRule(first=datetime(2026, 1, 31, 9), unit="month")
+
+    found = list(rule.between(datetime(2026, 2, 1), datetime(2026, 5, 1)))
+
+    assert found == [
+        datetime(2026, 2, 28, 9),
+        datetime(2026, 3, 31, 9),
+        datetime(2026, 4, 30, 9),
+    ]
+
+
+def test_reminder_stops_at_earliest_end_date() -> None:
+    reminder = Reminder(
+        category="Medication",
+        reminder_time=time(20, 0),
+        frequency="Daily",
+        start_date=date(2026, 5, 1),
+        end_date=date(2026, 5, 3),
+        end_frequency_date=date(2026, 6, 1),
+        created_at=datetime(2026, 4, 30),
+    )
+
+    found = occurrences(reminder, datetime(2026, 4, 1), datetime(2026, 7, 1))
+
+    assert found == [
+        datetime(2026, 5, 1, 20),
+        datetime(2026, 5, 2, 20),
+        datetime(2026, 5, 3, 20),
+    ]
+
+
+def test_one_off_and_inactive_reminders() -> None:
+    one_off = Reminder(
+        category="Vet appointment",
+        reminder_time=time(10, 30),
+        frequency="Never",
+        reminder_date=date(2026, 5, 4),
+    )
+    assert occurrences(one_off, datetime(2026, 5, 1), datetime(2026, 6, 1)) == [
+        datetime(2026, 5, 4, 10, 30)
+    ]
+    assert occurrences(one_off, datetime(2026, 5, 5), datetime(2026, 6, 1)) == []
+
+    one_off.is_active = False
+    assert occurrences(one_off, datetime(2026, 5, 1), datetime(2026, 6, 1)) == []
+
+
+def test_schedule_follows_the_reminders_timezone() -> None:
+    reminder = Reminder(
+        category="Walk",
+        reminder_time=time(8, 0),
+        frequency="Daily",
+        start_date=date(2026, 3, 27),
+        end_date=date(2026, 3, 30),
+        timezone="Europe/Paris",
+    )
+
+    found = occurrences(reminder, datetime(2026, 3, 1), datetime(2026, 4, 1))
+
+    # 08:00 in Paris, before and after the switch to summer time on the 29th
+    assert found == [
+        datetime(2026, 3, 27, 7),
+        datetime(2026, 3, 28, 7),
+        datetime(2026, 3, 29, 6),
+        datetime(2026, 3, 30, 6),
+    ]
+    # The window is UTC too
+    assert occurrences(reminder, datetime(2026, 3, 28, 7, 1), datetime(2026, 3, 29, 7)) == [
+        datetime(2026, 3, 29, 6)
+    ]
+
+
+def test_hourly_steps_in_real_time_across_dst() -> None:
+    reminder = Reminder(
+        category="Medication",
+        reminder_time=time(0, 0),
+        frequency="Every 1 hour",
+        start_date=date(2026, 3, 29),
+        end_date=date(2026, 3, 29),
+        timezone="Europe/Paris",
+    )
+
+    found = occurrences(reminder, datetime(2026, 3, 28), datetime(2026, 3, 29, 4))
+
+    assert found == [datetime(2026, 3, 28, 23)] + [
+        datetime(2026, 3, 29, hour) for hour in range(4)
+    ]
@@ -0,0 +1,94 @@
+import asyncio
+import uuid
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core import replicas
+from app.core.replicas import Replica, ReplicaRouter, create_replica
+from app.tests.utils.cache import BrokenRedis, FakeRedis
+
+
+@pytest.fixture
+def replica(tmp_path: Path) -> Iterator[Replica]:
+    replica = create_replica(f"sqlite:///{tmp_path / 'replica.db'}", with_async=False)
+    yield replica
+    replica.engine.dispose()
+
+
+def test_reads_wait_for_a_healthy_replica(replica: Replica) -> None:
+    router = ReplicaRouter([replica], max_lag=5, sticky_seconds=10)
+    user_id = uuid.uuid4()
+
+    assert router.pick(user_id) is None
+    router.check_lag()
+    assert router.pick(user_id) is replica
+
+    replica.lag = 30.0
+    assert router.pick(user_id) is None
+    assert router.stats()["fallbacks"] == 2
+
+
+def test_unreachable_replica_is_skipped(tmp_path: Path) -> None:
+    (tmp_path / "missing").mkdir()
+    broken = create_replica(f"sqlite:///{tmp_path / 'missing'}", with_async=False)
+    router = ReplicaRouter([broken], max_lag=5, sticky_seconds=10)
+
+    router.check_lag()
+
+    assert broken.lag is None
+    assert router.pick(uuid.uuid4()) is None
+
+
+def test_writer_reads_from_primary_after_commit(
+    replica: Replica, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    shared = FakeRedis()
+    router = ReplicaRouter([replica], max_lag=5, sticky_seconds=10, shared=shared)
+    monkeypatch.setattr(replicas, "replica_router", router)
+    router.check_lag()
+    writer, reader = uuid.uuid4(), uuid.uuid4()
+
+    request_state = SimpleNamespace(principal_id=writer)
+    with Session(replica.engine, info={"request_state": request_state}) as session:
+        session.execute(text("CREATE TABLE t (x INTEGER)"))
+        session.commit()
+
+    assert router.pick(writer) is None
+    assert router.pick(reader) is replica
+    # Another worker sees the mark through the shared cache
+    other_worker = ReplicaRouter([replica], max_lag=5, sticky_seconds=10, shared=shared)
+    other_worker.check_lag()
+    assert other_worker.pick(writer) is None
+    assert asyncio.run(other_worker.apick(writer)) is None
+    assert asyncio.run(other_worker.apick(reader)) is replica
+
+
+def test_replica_not_streaming_is_skipped(
+    replica: Replica, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    router = ReplicaRouter([replica], max_lag=5, sticky_seconds=10)
+    monkeypatch.setattr(Replica, "measure_lag", lambda _self: None)
+
+    router.check_lag()
+
+    assert replica.lag is None
+    assert router.pick(uuid.uuid4()) is None
+
+
+def test_shared_cache_errors_fall_back_to_primary(replica: Replica) -> None:
+    router = ReplicaRouter([replica], max_lag=5, sticky_seconds=10, shared=BrokenRedis())
+    router.check_lag()
+    writer, reader = uuid.uuid4(), uuid.uuid4()
+
+    router.mark_write(writer)
+
+    assert router.pick(writer) is None
+    assert asyncio.run(router.apick(writer)) is None
+    # Without the shared mark it can't rule out a write on another worker
+    assert asyncio.run(router.apick(reader)) is None
+    assert router.pick(reader) is None
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from app import crud
+from app.model.barcode_product import BarcodeProductCreate
+from app.tests.utils.utils import random_lower_string
+
+
+def test_get_barcode_product_miss(db: Session) -> None:
+    product = crud.get_barcode_product(
+        session=db, barcode_data=random_lower_string(), barcode_type="EAN13"
+    )
+    assert product is None
+
+
+def test_save_barcode_products_dedupes_and_upserts(db: Session) -> None:
+    barcode = random_lower_string()
+    expires_at = datetime.utcnow() + timedelta(days=1)
+    crud.save_barcode_products(
+        session=db,
+        products_in=[
+            BarcodeProductCreate(
+                barcode_data=barcode, barcode_type="EAN13", product_data={"n": 1}
+            ),
+            # Same barcode twice in one batch: the last one wins
+            BarcodeProductCreate(
+                barcode_data=barcode, barcode_type="EAN13", product_data={"n": 2}
+            ),
+            BarcodeProductCreate(
+                barcode_data=barcode, barcode_type="UPCA", product_data={"n": 3}
+            ),
+        ],
+        version=1,
+        expires_at=expires_at,
+    )
+    product = crud.get_barcode_product(
+        session=db, barcode_data=barcode, barcode_type="EAN13"
+    )
+    assert product is not None
+    assert product.product_data == {"n": 2}
+    assert product.expires_at == expires_at
+    first_id = product.id
+
+    crud.save_barcode_products(
+        session=db,
+        products_in=[
+            BarcodeProductCreate(
+                barcode_data=barcode, barcode_type="EAN13", product_data={"n": 4}
+            )
+        ],
+        version=2,
+        expires_at=None,
+    )
+    db.expire_all()
+    product = crud.get_barcode_product(
+        session=db, barcode_data=barcode, barcode_type="EAN13"
+    )
+    assert product is not None
+    assert product.id == first_id
+    assert product.product_data == {"n": 4}
+    assert product.version == 2
+    assert product.expires_at is None
+    other = crud.get_barcode_product(session=db, barcode_data=barcode, barcode_type="UPCA")
+    assert other is not None
+    assert other.product_data == {"n": 3}
@@ -0,0 +1,128 @@
+from collections.abc import Sequence
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlmodel import Session, select
+
+from app import crud
+from app.core.notifications import DueReminder
+from app.model.pet import Pet
+from app.model.reminder import Reminder
+from app.model.reminder_occurrence import ReminderOccurrence
+from app.model.user import UserCreate
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+class RecordingNotifier:
+    def __init__(self) -> None:
+        self.sent: list[DueReminder] = []
+
+    def send(self, due: Sequence[DueReminder]) -> None:
+        self.sent.extend(due)
+
+
+def _reminder(db: Session, *, notification: bool, fire_at: list[datetime]) -> Reminder:
+    user = crud.create_user(
+        session=db,
+        user_create=UserCreate(
+            email=random_email(),
+            name=random_lower_string(),
+            password=random_lower_string(),
+            notification=notification,
+        ),
+    )
+    pet = Pet(name="Nala", user_id=user.id)
+    reminder = Reminder(
+        pet=pet, category="Walk", reminder_time=time(8), frequency="Never"
+    )
+    db.add(reminder)
+    db.flush()
+    db.add_all(
+        ReminderOccurrence(reminder_id=reminder.id, pet_id=pet.id, fire_at=at)
+        for at in fire_at
+    )
+    db.commit()
+    return reminder
+
+
+def _dispatch(db: Session, notifier: RecordingNotifier, now: datetime) -> None:
+    while crud.dispatch_due_reminders(
+        session=db,
+        notifier=notifier,
+        now=now,
+        lookahead=timedelta(minutes=1),
+        max_lateness=timedelta(hours=1),
+        batch_size=2,
+    ):
+        pass
+
+
+def test_dispatch_sends_due_occurrences_once(db: Session) -> None:
+    now = datetime.utcnow()
+    due = [now - timedelta(seconds=10), now + timedelta(seconds=30)]
+    stale = now - timedelta(hours=2)
+    later = now + timedelta(minutes=5)
+    reminder = _reminder(db, notification=True, fire_at=[*due, stale, later])
+    notifier = RecordingNotifier()
+
+    _dispatch(db, notifier, now)
+    _dispatch(db, notifier, now)
+
+    sent = [d.fire_at for d in notifier.sent if d.reminder_id == reminder.id]
+    assert sorted(sent) == due
+    pending = db.exec(
+        select(ReminderOccurrence.fire_at).where(
+            ReminderOccurrence.reminder_id == reminder.id,
+            ReminderOccurrence.dispatched_at == None,  # noqa: E711
+        )
+    ).all()
+    assert pending == [later]
+
+
+def test_dispatch_skips_users_with_notifications_off(db: Session) -> None:
+    now = datetime.utcnow()
+    reminder = _reminder(db, notification=False, fire_at=[now])
+    notifier = RecordingNotifier()
+
+    _dispatch(db, notifier, now)
+
+    assert all(d.reminder_id != reminder.id for d in notifier.sent)
+    occurrence = db.exec(
+        select(ReminderOccurrence).where(ReminderOccurrence.reminder_id == reminder.id)
+    ).one()
+    db.refresh(occurrence)
+    assert occurrence.dispatched_at is not None
+
+
+def test_dispatch_fires_at_the_reminders_local_time(db: Session) -> None:
+    now = datetime.utcnow()
+    fire_at = now + timedelta(seconds=30)
+    local = fire_at.replace(tzinfo=ZoneInfo("UTC")).astimezone(ZoneInfo("Asia/Tokyo"))
+    user = crud.create_user(
+        session=db,
+        user_create=UserCreate(
+            email=random_email(),
+            name=random_lower_string(),
+            password=random_lower_string(),
+        ),
+    )
+    reminder = Reminder(
+        pet=Pet(name="Mochi", user_id=user.id),
+        category="Food",
+        reminder_time=local.time(),
+        reminder_date=local.date(),
+        frequency="Never",
+        timezone="Asia/Tokyo",
+    )
+    db.add(reminder)
+    crud.schedule_reminders(
+        session=db, reminders=[reminder], start=now, until=now + timedelta(days=1)
+    )
+    db.commit()
+    notifier = RecordingNotifier()
+
+    _dispatch(db, notifier, now)
+
+    [sent] = [d for d in notifier.sent if d.reminder_id == reminder.id]
+    assert sent.fire_at == fire_at
+    assert sent.local_fire_at == local
@@ -0,0 +1,33 @@
+from typing import Any
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+
+    def get(self, name: str) -> Any:
+        return self.data.get(name)
+
+    def set(self, name: str, value: Any, ex: int | None = None) -> Any:  # noqa: ARG002
+        self.data[name] = value
+        return True
+
+    def delete(self, *names: str) -> Any:
+        for name in names:
+            self.data.pop(name, None)
+        return len(names)
+
+
+class BrokenRedis(FakeRedis):
+    """
+    A shared cache whose backend is down.
+    """
+
+    def get(self, name: str) -> Any:  # noqa: ARG002
+        raise ConnectionError("redis is down")
+
+    def set(self, name: str, value: Any, ex: int | None = None) -> Any:  # noqa: ARG002
+        raise ConnectionError("redis is down")
+
+    def delete(self, *names: str) -> Any:  # noqa: ARG002
+        raise ConnectionError("redis is down")